@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.urls import URLPattern, URLResolver
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+executor = None
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_READ_WORKERS,
+            thread_name_prefix='api-read')
+    return executor
+
+
+def run_view(view, request, args, kwargs):
+    """Выполняет синхронный вид DRF в текущем потоке и рендерит ответ.
+
+    Счётчик запросов и профилировщик, подготовленные middleware
+    (`request.query_stats`, `request.profiler`), подключаются здесь, в
+    потоке, где идут обращения к БД.
+    """
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            stats = getattr(request, 'query_stats', None)
+            if stats is not None:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+            profiler = getattr(request, 'profiler', None)
+            if profiler is not None:
+                profiler.enable()
+                stack.callback(profiler.disable)
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+            return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view, pooled=False):
+    """Асинхронная обёртка синхронного вида для ASGI.
+
+    С `pooled=True` чтение выполняется в ограниченном пуле
+    `ASYNC_READ_WORKERS` потоков, и медленные клиенты ждут ответа в
+    цикле событий, не занимая потоков. Запись, как и обычные
+    синхронные виды в ASGI, идёт в общем потоке Django.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if pooled and request.method in READ_METHODS:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                get_executor(), functools.partial(
+                    context.run, run_view, view, request, args, kwargs))
+        return await sync_to_async(run_view, thread_sensitive=True)(
+            view, request, args, kwargs)
+
+    return wrapper
+
+
+def with_async_views(patterns, pooled_routes, excluded_routes=()):
+    """Копия urlpatterns, где все виды обёрнуты `async_view`.
+
+    Для маршрутов из `pooled_routes` чтение идёт в пуле потоков,
+    маршруты из `excluded_routes` не копируются.
+    """
+    wrapped = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            wrapped.append(URLResolver(
+                pattern.pattern,
+                with_async_views(
+                    pattern.url_patterns, pooled_routes, excluded_routes),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace))
+            continue
+        if pattern.name in excluded_routes:
+            continue
+        wrapped.append(URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback,
+                       pooled=pattern.name in pooled_routes),
+            pattern.default_args, pattern.name))
+    return wrapped
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с данными, нужными для проверки прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из утверждений токена без запроса к БД.
+
+    Атрибуты, которых нет в токене, берутся из строки `User`, загружаемой
+    при первом обращении (`full_user`).
+    """
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == User.Role.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.Role.MODERATOR
+
+    @cached_property
+    def full_user(self):
+        try:
+            user = User.objects.get(pk=self.id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Пользователь не найден.',
+                                       code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('Пользователь неактивен.',
+                                       code='user_inactive')
+        return user
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.full_user, attr)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, Model)):
+            return self.id == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+def get_user_instance(user):
+    """Строка `User` для `request.user`, если view нужна модель целиком."""
+    return getattr(user, 'full_user', user)
+
+
+class TokenCache:
+    """Ограниченный LRU-кеш проверенных токенов с учётом срока действия.
+
+    Ключ — исходная строка токена, значение — проверенный токен; запись
+    перестаёт выдаваться с наступлением `exp` токена.
+    """
+
+    def __init__(self, maxsize, clock=time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is not None:
+                token, expires_at = entry
+                if self.clock() < expires_at:
+                    self._entries.move_to_end(raw_token)
+                    self.hits += 1
+                    return token
+                del self._entries[raw_token]
+            self.misses += 1
+            return None
+
+    def set(self, raw_token, token):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[raw_token] = (token, token['exp'])
+            self._entries.move_to_end(raw_token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+token_cache = TokenCache(settings.ACCESS_TOKEN_CACHE_SIZE)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Аутентификация без чтения `User` для токенов с утверждениями.
+
+    Токены без утверждений `USER_CLAIMS` проверяются по базе, как раньше.
+    Проверенные токены кешируются в `token_cache`, поэтому подпись
+    повторно используемого токена проверяется один раз.
+
+    Для изменяющих запросов строка `User` загружается всегда, и
+    деактивированный пользователь получает 401. Чтение по утверждениям
+    токена остаётся доступным ему до истечения срока токена.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None and request.method not in SAFE_METHODS:
+            get_user_instance(result[0])
+        return result
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
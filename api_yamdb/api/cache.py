@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+from reviews.models import DataVersion
+
+
+def get_list_cache():
+    return caches[settings.LIST_CACHE_ALIAS]
+
+
+def get_version(prefix):
+    return DataVersion.get(prefix)
+
+
+def invalidate(*prefixes):
+    """Сменяет версию данных: сбрасывает кеш и валидаторы ETag.
+
+    Версии хранятся в БД (`reviews.models.DataVersion`) и входят в ключи
+    кеша, поэтому устаревшие записи не читаются ни одним процессом, даже
+    с кешем в памяти процесса. Из версии же строится заголовок
+    Last-Modified.
+    """
+    DataVersion.bump(*prefixes)
+
+
+class PendingInvalidation:
+    """Области, версии которых сменятся после фиксации транзакции."""
+
+    def __init__(self):
+        self.prefixes = set()
+
+    def __call__(self):
+        invalidate(*self.prefixes)
+
+
+def invalidate_on_commit(*prefixes):
+    """`invalidate` после фиксации транзакции, одним запросом на неё.
+
+    Каскадное удаление шлёт сигнал на каждый отзыв и комментарий;
+    их области копятся в одном отложенном вызове. При откате Django
+    отбрасывает и его.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        invalidate(*prefixes)
+        return
+    for _, callback in connection.run_on_commit:
+        if isinstance(callback, PendingInvalidation):
+            callback.prefixes.update(prefixes)
+            return
+    pending = PendingInvalidation()
+    pending.prefixes.update(prefixes)
+    transaction.on_commit(pending)
+
+
+def build_key(prefix, request):
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return (f'{prefix}:{get_version(prefix)}:'
+            f'{request.get_host()}{request.path}?{params}')
+
+
+TITLES_SCOPE = 'reviews.title'
+
+
+def reviews_scope(title_id):
+    return f'reviews.review:{title_id}'
+
+
+def comments_scope(review_id):
+    return f'reviews.comment:{review_id}'
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db.models import Count
+from django.utils.http import urlencode
+from reviews.models import Title
+
+from .cache import TITLES_SCOPE, get_list_cache, get_version
+from .filter import TitleFilter
+
+# Фасет -> (колонка для группировки в values(), её фильтр в TitleFilter).
+FACETS = {
+    'genre': ('genre__slug', 'genre'),
+    'category': ('category__slug', 'category'),
+    'year': ('year', 'year'),
+}
+
+
+def filter_params(query_params, exclude=None):
+    """Параметры `TitleFilter` из запроса, кроме фильтра `exclude`."""
+    return sorted(
+        (name, query_params[name]) for name in TitleFilter.base_filters
+        if name in query_params and name != exclude
+    )
+
+
+def facet_key(name, params, version):
+    return f'{TITLES_SCOPE}:facets:{version}:{name}?{urlencode(params)}'
+
+
+def count_facet(name, params):
+    """Число произведений на каждое значение фасета одним запросом."""
+    column, _ = FACETS[name]
+    titles = TitleFilter(dict(params), queryset=Title.objects.all()).qs
+    if name == 'genre':
+        rows = Title.genre.through.objects.filter(
+            title__in=titles.values('pk')
+        ).values_list('genre__slug').annotate(count=Count('title_id'))
+    else:
+        rows = titles.filter(**{f'{column}__isnull': False}).order_by(
+        ).values_list(column).annotate(count=Count('pk', distinct=True))
+    return {str(value): count for value, count in rows.order_by(column)}
+
+
+def get_facets(query_params, names, version=None):
+    """Счётчики фасетов `names` для текущего набора фильтров.
+
+    Каждый фасет считается по всем фильтрам, кроме собственного: рядом
+    с каждым вариантом показывается, сколько произведений останется,
+    если выбрать его вместо текущего. Результат кешируется по имени
+    фасета и остальным фильтрам до следующего изменения произведений.
+    """
+    cache = get_list_cache()
+    params = {
+        name: filter_params(query_params, exclude=FACETS[name][1])
+        for name in names
+    }
+    if version is None:
+        version = get_version(TITLES_SCOPE)
+    keys = {
+        name: facet_key(name, params[name], version) for name in names
+    }
+    cached = cache.get_many(keys.values())
+    facets, missing = {}, {}
+    for name in names:
+        if keys[name] in cached:
+            facets[name] = cached[keys[name]]
+        else:
+            facets[name] = missing[keys[name]] = count_facet(
+                name, params[name])
+    if missing:
+        cache.set_many(missing, settings.LIST_CACHE_TIMEOUT)
+    return facets
@@ -1,12 +1,42 @@
+from django.db.models import Q
 from django_filters.rest_framework import CharFilter, FilterSet
+from rest_framework.filters import SearchFilter
+from reviews.fields import FoldedCharField, fold, prefix_q
 from reviews.models import Title
 
 
+class FoldedPrefixSearchFilter(SearchFilter):
+    """Поиск по префиксу полей из `search_fields` представления.
+
+    Для полей `FoldedCharField` запрос нормализуется так же, как значение,
+    для остальных приводится к нижнему регистру.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        search_fields = self.get_search_fields(view, request)
+        if not term or not search_fields:
+            return queryset
+        query = Q()
+        for name in search_fields:
+            field = queryset.model._meta.get_field(name)
+            query |= prefix_q(name, fold(term) if isinstance(
+                field, FoldedCharField) else term.lower())
+        return queryset.filter(query)
+
+
 class TitleFilter(FilterSet):
-    name = CharFilter(lookup_expr='icontains')
+    name = CharFilter(method='filter_name')
     genre = CharFilter(field_name='genre__slug')
     category = CharFilter(field_name='category__slug')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ['year']
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(prefix_q('name_folded', fold(value)))
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken)
+
+
+class Command(BaseCommand):
+    help = ('Удаляет просроченные токены из таблиц token_blacklist '
+            'короткими транзакциями. Подходит для запуска из cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', default=1000, type=int,
+            help='Количество токенов, удаляемых в одной транзакции.')
+        parser.add_argument(
+            '--pause', default=0.0, type=float,
+            help='Пауза между транзакциями, с.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        started = time.monotonic()
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(
+            expires_at__lte=now).order_by('id')
+        removed = {OutstandingToken: 0, BlacklistedToken: 0}
+        batches = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                _, counts = OutstandingToken.objects.filter(
+                    id__in=ids).delete()
+            for model in removed:
+                removed[model] += counts.get(model._meta.label, 0)
+            batches += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено токенов: {removed[OutstandingToken]}, '
+            f'из них в чёрном списке: {removed[BlacklistedToken]}; '
+            f'транзакций: {batches}, '
+            f'время: {time.monotonic() - started:.2f} с.'
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.models import SCORE_FIELDS, Title
+
+from api.cache import TITLES_SCOPE, invalidate
+
+COUNTERS = ('rating_sum', 'rating_count', 'rating', *SCORE_FIELDS.values())
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает по отзывам рейтинги и распределение оценок '
+            'произведений и сообщает, сколько значений расходилось.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', default=1000, type=int,
+            help='Количество произведений в одной транзакции.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        titles = Title.objects.order_by('id')
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            ids = list(titles.filter(id__gt=last_id).values_list(
+                'id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                before = set(titles.filter(id__in=ids).values_list(
+                    'id', *COUNTERS))
+                Title.recalculate_ratings(ids)
+                after = set(titles.filter(id__in=ids).values_list(
+                    'id', *COUNTERS))
+            checked += len(ids)
+            fixed += len(after - before)
+            last_id = ids[-1]
+        if fixed:
+            invalidate(TITLES_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено произведений: {checked}, исправлено: {fixed}.'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from reviews.models import TitleRanking
+
+from api.cache import TITLES_SCOPE, invalidate
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает материализованный рейтинг произведений для '
+            '/api/v1/titles/top/. Рейтинг обновляется при каждой записи; '
+            'команда нужна после загрузок в обход модели и для '
+            'периодической сверки.')
+
+    def handle(self, *args, **options):
+        TitleRanking.refresh()
+        invalidate(TITLES_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк в рейтинге: {TitleRanking.objects.count()}.'
+        ))
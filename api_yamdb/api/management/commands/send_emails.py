@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from reviews.models import OutgoingEmail
+
+# На это время выбранные письма скрыты от других экземпляров команды.
+LEASE = timedelta(minutes=5)
+
+
+def send_chunk(emails):
+    """Отправляет письма через одно соединение с почтовым сервером.
+
+    Возвращает пары (письмо, текст ошибки или None). Если соединение
+    открыть не удалось, ошибка записывается всем письмам пакета.
+    """
+    connection = mail.get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        return [(email, repr(error)) for email in emails]
+    results = []
+    try:
+        for email in emails:
+            try:
+                mail.EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection).send()
+            except Exception as error:
+                results.append((email, repr(error)))
+            else:
+                results.append((email, None))
+    finally:
+        connection.close()
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', default=100, type=int,
+            help='Количество писем, выбираемых за один проход.')
+        parser.add_argument(
+            '--workers', default=4, type=int,
+            help='Количество потоков отправки.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать непрерывно, опрашивая очередь.')
+        parser.add_argument(
+            '--interval', default=5.0, type=float,
+            help='Пауза между опросами пустой очереди в режиме --loop, с.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError(
+                '--batch-size и --workers должны быть положительными.')
+        self.max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.retry_delay = settings.EMAIL_OUTBOX_RETRY_DELAY
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                sent, failed = self.process_batch(
+                    executor, options['batch_size'], options['workers'])
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, с ошибкой: {failed}.')
+                    continue
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+
+    def claim_batch(self, batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(sent_at__isnull=True,
+                        next_attempt_at__lte=now,
+                        attempts__lt=self.max_attempts)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            OutgoingEmail.objects.filter(
+                id__in=[email.id for email in emails]
+            ).update(next_attempt_at=now + LEASE)
+        return emails
+
+    def process_batch(self, executor, batch_size, workers):
+        emails = self.claim_batch(batch_size)
+        if not emails:
+            return 0, 0
+        chunks = [emails[index::workers] for index in range(workers)]
+        sent_ids = []
+        failures = []
+        for results in executor.map(send_chunk, filter(None, chunks)):
+            for email, error in results:
+                if error is None:
+                    sent_ids.append(email.id)
+                else:
+                    failures.append((email, error))
+        now = timezone.now()
+        # Текст письма с кодом подтверждения не храним дольше, чем нужно:
+        # после отправки или последней неудачной попытки.
+        OutgoingEmail.objects.filter(id__in=sent_ids).update(
+            sent_at=now, attempts=F('attempts') + 1, last_error='',
+            body='')
+        for email, error in failures:
+            delay = self.retry_delay * 2 ** email.attempts
+            exhausted = email.attempts + 1 >= self.max_attempts
+            OutgoingEmail.objects.filter(id=email.id).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=delay),
+                last_error=error,
+                **({'body': ''} if exhausted else {}))
+        return len(sent_ids), len(failures)
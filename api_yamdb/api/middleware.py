@@ -0,0 +1,270 @@
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import random
+import threading
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+
+from api.authentication import ClaimsJWTAuthentication
+from api.permissions import IsAdmin
+
+logger = logging.getLogger(__name__)
+
+PROFILING_PREFIX = '/api/v1/'
+# Группа времени профиля и фрагменты путей к файлам её функций.
+PROFILE_BUCKETS = (
+    ('serializer', ('rest_framework/serializers.py',
+                    'rest_framework/fields.py',
+                    'rest_framework/relations.py',
+                    'api/serializers.py')),
+    ('permission', ('rest_framework/permissions.py',
+                    'api/permissions.py')),
+    ('db', ('django/db/',)),
+)
+# Значение `?profile=` или `X-Profile` -> режим; прочие значения, в том
+# числе `0`, профилирование не включают.
+PROFILE_MODES = {'1': 'summary', 'json': 'summary', 'headers': 'headers'}
+
+
+class QueryStats:
+    """Число запросов к БД и время их выполнения в рамках одного запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def get_view_name(request, view_func):
+    """Имя вида `TitleViewSet.list` для DRF и имя функции для прочих."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', repr(view_func))
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+def get_budget(view_name):
+    budgets = settings.QUERY_BUDGETS
+    return budgets.get(view_name, budgets['default'])
+
+
+class AsyncCapableMiddleware:
+    """Основа middleware, работающего и в WSGI, и в ASGI без адаптеров."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+
+class AsgiUrlconfMiddleware(AsyncCapableMiddleware):
+    """Под ASGI разрешает URL по `ASGI_URLCONF` с асинхронными видами."""
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.urlconf = settings.ASGI_URLCONF
+        return await self.get_response(request)
+
+
+class QueryCountMiddleware(AsyncCapableMiddleware):
+    """Считает запросы к БД, отдаёт их в заголовках и логирует превышения.
+
+    Бюджеты задаются в `QUERY_BUDGETS`: ключ `default` и имена видов.
+    Под ASGI запросы к БД идут в других потоках, поэтому счётчик
+    передаётся в `request.query_stats` и подключается там
+    (`api.async_views.run_view`).
+    """
+
+    def handle(self, request):
+        stats = request.query_stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats = request.query_stats = QueryStats()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        total = time.perf_counter() - started
+        db_ms = stats.duration * 1000
+        response['X-Query-Count'] = str(stats.count)
+        timings = [
+            f'db;dur={db_ms:.1f};desc="{stats.count} queries"',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        if response.has_header('Server-Timing'):
+            timings.append(response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(timings)
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        view_name = get_view_name(request, match.func)
+        max_queries, max_ms = get_budget(view_name)
+        if stats.count > max_queries or db_ms > max_ms:
+            logger.warning(
+                '%s %s: %d queries, %.1f ms in DB (budget %d, %.1f ms)',
+                view_name, request.path, stats.count, db_ms,
+                max_queries, max_ms)
+        return response
+
+
+def get_bucket(filename):
+    for bucket, parts in PROFILE_BUCKETS:
+        if any(part in filename for part in parts):
+            return bucket
+    return 'other'
+
+
+def summarize_profile(profiler, limit):
+    """Самые дорогие функции и собственное время по группам, в мс.
+
+    Группы считаются по собственному времени функций (tottime), поэтому
+    не пересекаются: запросы из сериализатора попадают в `db`.
+    """
+    stats = pstats.Stats(profiler).stats
+    buckets = dict.fromkeys(
+        [bucket for bucket, _ in PROFILE_BUCKETS] + ['other'], 0.0)
+    for (filename, _, _), (_, _, own_time, _, _) in stats.items():
+        buckets[get_bucket(filename)] += own_time * 1000
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return {
+        'total_ms': round(sum(buckets.values()), 3),
+        'buckets_ms': {
+            bucket: round(value, 3) for bucket, value in buckets.items()
+        },
+        'top': [
+            {
+                'function': f'{filename}:{line}({name})',
+                'calls': calls,
+                'tottime_ms': round(own_time * 1000, 3),
+                'cumtime_ms': round(cumulative * 1000, 3),
+            }
+            for (filename, line, name), (_, calls, own_time, cumulative, _)
+            in top[:limit]
+        ],
+    }
+
+
+class ProfilingMiddleware(AsyncCapableMiddleware):
+    """Профилирует запросы к API через cProfile.
+
+    Администратор получает сводку, добавив к запросу `?profile=1` или
+    заголовок `X-Profile: 1` (`json` — то же; сводка вместо ответа) либо
+    значение `headers` (ответ, а группы времени — в `Server-Timing`).
+    Кроме того, доля `PROFILING_SAMPLE_RATE` всех запросов профилируется
+    в фоне, и сводка пишется в лог. Под ASGI профилировщик передаётся в
+    `request.profiler` и включается в потоке, где выполняется вид.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # cProfile нельзя запускать в нескольких потоках одновременно.
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def requested_mode(request):
+        value = (request.GET.get('profile')
+                 or request.META.get('HTTP_X_PROFILE', ''))
+        return PROFILE_MODES.get(value.strip().lower())
+
+    def get_mode(self, request):
+        mode = self.requested_mode(request)
+        return mode if mode and self.is_admin(request) else None
+
+    def handle(self, request):
+        if not request.path.startswith(PROFILING_PREFIX):
+            return self.get_response(request)
+        mode = self.get_mode(request)
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not (mode or sampled) or not self.lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            self.lock.release()
+        return self.finish(request, response, profiler, mode, sampled)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(PROFILING_PREFIX):
+            return await self.get_response(request)
+        mode = None
+        if self.requested_mode(request):
+            mode = await sync_to_async(self.get_mode)(request)
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not (mode or sampled) or not self.lock.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profiler = request.profiler = cProfile.Profile()
+            response = await self.get_response(request)
+        finally:
+            self.lock.release()
+        return self.finish(request, response, profiler, mode, sampled)
+
+    def finish(self, request, response, profiler, mode, sampled):
+        summary = summarize_profile(profiler, settings.PROFILING_TOP)
+        if sampled:
+            logger.info('profile %s %s: %s', request.method, request.path,
+                        json.dumps(summary))
+        if mode is None:
+            return response
+        if mode == 'headers':
+            timings = ', '.join(
+                f'prof-{bucket};dur={value}'
+                for bucket, value in summary['buckets_ms'].items()
+            )
+            response['Server-Timing'] = timings
+            return response
+        summary['status'] = response.status_code
+        return JsonResponse(summary)
+
+    @staticmethod
+    def is_admin(request):
+        try:
+            result = ClaimsJWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        if result is None:
+            return False
+        return IsAdmin().has_permission(
+            SimpleNamespace(user=result[0]), None)
@@ -1,11 +1,135 @@
-from rest_framework import filters, mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+
+from .cache import build_key, get_list_cache, get_version
+from .filter import FoldedPrefixSearchFilter
+
+
+class CachedListMixin:
+    """Кеширует сериализованные страницы списка.
+
+    Кеш сбрасывается сигналами модели (см. `api.signals`).
+    """
+
+    def list(self, request, *args, **kwargs):
+        cache = get_list_cache()
+        key = build_key(self.queryset.model._meta.label_lower, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.LIST_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+    """Отдаёт ETag и Last-Modified, отвечает 304 без сериализации.
+
+    Валидаторы строятся из версии области данных (`get_condition_scope`),
+    которую сигналы меняют при каждой записи. Прочитанная версия
+    остаётся в `data_version` для ключей кеша того же запроса.
+    """
+
+    def get_condition_scope(self):
+        raise NotImplementedError
+
+    def get_validators(self, request):
+        scope = self.get_condition_scope()
+        version = self.data_version = get_version(scope)
+        digest = hashlib.md5(
+            f'{version}:{request.accepted_renderer.format}:'
+            f'{request.get_full_path()}'.encode()
+        ).hexdigest()
+        return quote_etag(digest), version // 10 ** 9
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+def flatten_select_related(lookups, prefix=''):
+    for name, nested in lookups.items():
+        yield prefix + name
+        yield from flatten_select_related(nested, f'{prefix}{name}__')
+
+
+class SparseFieldsMixin:
+    """Не выбирает из БД колонки полей, убранных `?fields=`/`?omit=`.
+
+    Поля сериализатора отсекает `SparseFieldsSerializerMixin`; здесь
+    к запросу применяется `only()`, а связи убранных полей исключаются из
+    `select_related`/`prefetch_related`. Внешние ключи и поля сортировки
+    выбираются всегда: без них Django догружал бы объекты по одному.
+    Колонки для вычисляемых полей сериализатора задаёт `sparse_columns`.
+    """
+
+    sparse_columns = {}
+
+    def filter_queryset(self, queryset):
+        return self.sparse_queryset(super().filter_queryset(queryset))
+
+    def sparse_queryset(self, queryset):
+        params = self.request.query_params
+        if self.request.method != 'GET' or not (
+                'fields' in params or 'omit' in params):
+            return queryset
+        sources = set()
+        for name, field in self.get_serializer().fields.items():
+            sources.add(field.source.split('.')[0])
+            sources.update(self.sparse_columns.get(name, ()))
+        query = queryset.query
+        if isinstance(query.select_related, dict):
+            lookups = [
+                lookup for lookup in
+                flatten_select_related(query.select_related)
+                if lookup.split('__')[0] in sources
+            ]
+            queryset = queryset.select_related(None)
+            if lookups:
+                queryset = queryset.select_related(*lookups)
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+            in sources
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(
+            *prefetches)
+        meta = queryset.model._meta
+        ordering = {
+            name.lstrip('-').split('__')[0]
+            for name in (*meta.ordering, *query.order_by)
+            if isinstance(name, str)
+        }
+        return queryset.only(*(
+            field.name for field in meta.concrete_fields
+            if field.primary_key or field.is_relation
+            or field.name in sources or field.name in ordering
+        ))
 
 
 class CategoryGenreBaseViewSet(
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet
 ):
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'slug']
+    filter_backends = [FoldedPrefixSearchFilter]
+    search_fields = ['name_folded', 'slug']
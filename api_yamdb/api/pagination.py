@@ -0,0 +1,61 @@
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ('pub_date', 'id')
+
+
+class TopTitlesCursorPagination(CursorPagination):
+    """Страницы топа по индексу рейтинга, без OFFSET и COUNT(*)."""
+
+    ordering = ('-rating', '-rating_count', 'title_id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """Постраничная пагинация с переключением на курсорную.
+
+    Курсорный режим включается параметром `?pagination=cursor` (или
+    наличием `cursor` в запросе): страницы выбираются по индексу
+    `(pub_date, id)` без OFFSET и без запроса COUNT(*).
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.page_number_paginator = PageNumberPagination()
+        self.cursor_paginator = PubDateCursorPagination()
+        self.paginator = self.page_number_paginator
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor_paginator.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = (self.cursor_paginator if self.use_cursor(request)
+                          else self.page_number_paginator)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_paginator.get_paginated_response_schema(
+            schema)
+
+    def get_schema_fields(self, view):
+        return (self.page_number_paginator.get_schema_fields(view)
+                + self.cursor_paginator.get_schema_fields(view))
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_paginator.get_schema_operation_parameters(view)
+            + self.cursor_paginator.get_schema_operation_parameters(view)
+        )
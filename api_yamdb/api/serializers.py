@@ -1,7 +1,9 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (MAX_ID, SCORE_FIELDS, Category, Comment, Genre,
+                            Review, Title, User)
 
 MIN_SCORE = 1
 MAX_SCORE = 10
@@ -14,6 +16,11 @@ class ExistingRegistrationSerializer(serializers.Serializer):
 
 
 class NewRegistrationSerializer(serializers.ModelSerializer):
+    """Регистрация без запросов к БД при валидации.
+
+    Занятость username и email проверяется по пользователям, уже
+    выбранным во view и переданным в контексте как `existing_users`.
+    """
 
     def validate_username(self, value):
         if value.lower() == 'me':
@@ -21,9 +28,26 @@ class NewRegistrationSerializer(serializers.ModelSerializer):
                 'Использовать имя "me" в качестве username запрещено.')
         return value
 
+    def validate(self, data):
+        errors = {}
+        for user in self.context.get('existing_users', ()):
+            if user.username == data['username']:
+                errors['username'] = [
+                    'Пользователь с таким username уже существует.']
+            if user.email == data['email']:
+                errors['email'] = [
+                    'Пользователь с таким email уже существует.']
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
     class Meta:
         model = User
         fields = ('username', 'email')
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+        }
 
 
 class TokenSerializer(serializers.Serializer):
@@ -49,31 +73,83 @@ class UserSelfSerializer(serializers.ModelSerializer):
         read_only_fields = ('role', )
 
 
+def parse_field_names(request, param, available):
+    if param not in request.query_params:
+        return None
+    names = {name.strip() for name in
+             request.query_params[param].split(',') if name.strip()}
+    unknown = names - available
+    if unknown:
+        raise serializers.ValidationError(
+            {param: [f'Неизвестные поля: {", ".join(sorted(unknown))}.']})
+    return names
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в GET-ответе поля из `?fields=` и убирает поля из `?omit=`.
+
+    Значения — имена полей через запятую; неизвестное имя — ошибка 400.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        available = set(self.fields)
+        keep = parse_field_names(request, 'fields', available)
+        omit = parse_field_names(request, 'omit', available)
+        for name in available:
+            if (keep is not None and name not in keep
+                    or omit is not None and name in omit):
+                self.fields.pop(name)
+
+
 class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ['id']
+        exclude = ['id', 'name_folded']
         model = Category
 
 
 class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ['id']
+        exclude = ['id', 'name_folded']
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ['name_folded', 'rating_sum', 'rating_count',
+                   *SCORE_FIELDS.values()]
         model = Title
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class TitleDetailSerializer(TitleSerializer):
+    score_distribution = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
+
+
+class ScoreDistributionSerializer(serializers.ModelSerializer):
+    title = serializers.IntegerField(source='id', read_only=True)
+    count = serializers.IntegerField(source='rating_count', read_only=True)
+    distribution = serializers.DictField(
+        source='score_distribution', child=serializers.IntegerField(),
+        read_only=True)
+
+    class Meta:
+        fields = ('title', 'count', 'rating', 'distribution')
+        model = Title
+
+
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -84,7 +160,19 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class BulkReviewSerializer(serializers.Serializer):
+    """Один отзыв из пакета; произведение и уникальность проверяет view."""
+
+    title_id = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        validators=[MinValueValidator(MIN_SCORE),
+                    MaxValueValidator(MAX_SCORE)],
+        help_text='Поставьте оценку от 1 до 10.')
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -103,7 +191,7 @@ class ReviewSerializer(serializers.ModelSerializer):
             id=title_id
         )
         if (self.context['request'].method == 'POST'
-                and title.reviews.filter(author=author).exists()):
+                and title.reviews.filter(author_id=author.pk).exists()):
             raise serializers.ValidationError(
                 f'Отзыв на произведение {title.name} уже существует'
             )
@@ -0,0 +1,51 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, DataVersion, Genre, Review,
+                            Title, User)
+
+from .cache import (TITLES_SCOPE, comments_scope, invalidate_on_commit,
+                    reviews_scope)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_list_cache(sender, **kwargs):
+    invalidate_on_commit(sender._meta.label_lower, TITLES_SCOPE)
+
+
+@receiver([post_save, post_delete], sender=Title)
+def invalidate_titles(sender, instance, **kwargs):
+    invalidate_on_commit(TITLES_SCOPE, reviews_scope(instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, **kwargs):
+    invalidate_on_commit(TITLES_SCOPE)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    invalidate_on_commit(TITLES_SCOPE, reviews_scope(instance.title_id),
+                         comments_scope(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    invalidate_on_commit(comments_scope(instance.review_id))
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_name(sender, instance, created, **kwargs):
+    """Имя автора входит в отзывы и комментарии; переименования редки,
+    поэтому сбрасываются версии всех данных."""
+    loaded = instance._loaded_username
+    instance._loaded_username = instance.username
+    if not created and loaded is not None and loaded != instance.username:
+        invalidate_on_commit(DataVersion.ALL)
@@ -1,9 +1,9 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_code,
-                    get_token)
+                    ReviewViewSet, TitleViewSet, UserViewSet,
+                    bulk_create_reviews, export, get_code, get_token)
 
 app_name = 'api'
 
@@ -24,6 +24,9 @@ urlpatterns_v1 = [
     path('', include(router_v1.urls)),
     path('auth/signup/', get_code),
     path('auth/token/', get_token),
+    path('reviews/bulk/', bulk_create_reviews),
+    re_path(r'^export/(?P<resource>titles|reviews|comments)/$', export,
+            name='export'),
 
 ]
 
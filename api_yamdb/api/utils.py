@@ -1,11 +1,25 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator as dtg
 from django.core import mail
+from reviews.models import OutgoingEmail
 
 
 def send_mail(user):
+    """Отправляет код подтверждения.
+
+    При `EMAIL_OUTBOX_ENABLED` письмо только ставится в очередь одной
+    вставкой, а отправляет его команда `send_emails`.
+    """
     subject = 'Confirmation code'
     to = user.email
     from_email = settings.DEFAULT_FROM_EMAIL
     text_content = f'Confirmation code: {dtg.make_token(user)}'
+    if settings.EMAIL_OUTBOX_ENABLED:
+        OutgoingEmail.objects.create(
+            recipient=to,
+            subject=subject,
+            body=text_content,
+            from_email=from_email
+        )
+        return
     mail.send_mail(subject, text_content, from_email, [to])
@@ -1,37 +1,53 @@
-from django.db.models import Avg
 from django.contrib.auth.tokens import default_token_generator as dtg
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework import viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import (PageNumberPagination,
                                        LimitOffsetPagination)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import (Category,
+from reviews.models import (MAX_ID,
+                            SCORE_FIELDS,
+                            Category,
                             Genre,
                             Review,
                             Title,
+                            TitleRanking,
                             User
                             )
 from .permissions import IsAuthorOrReadOnly, IsAdminOrReadOnly, IsAdmin
-from .serializers import (CategorySerializer,
+from .serializers import (BulkReviewSerializer,
+                          CategorySerializer,
                           GenreSerializer,
                           TitleSerializer,
                           CommentSerializer,
                           ReviewSerializer,
+                          ScoreDistributionSerializer,
+                          TitleDetailSerializer,
                           ExistingRegistrationSerializer,
                           NewRegistrationSerializer,
                           TokenSerializer,
                           UserSerializer,
                           UserSelfSerializer
                           )
-from .mixins import CategoryGenreBaseViewSet
+from .authentication import ClaimsAccessToken, get_user_instance
+from .export import EXPORTS, parse_since, to_ndjson
+from .facets import FACETS, get_facets
+from .cache import TITLES_SCOPE, comments_scope, invalidate, reviews_scope
+from .mixins import (CategoryGenreBaseViewSet, ConditionalGetMixin,
+                     SparseFieldsMixin)
+from .pagination import (PageNumberOrCursorPagination,
+                         TopTitlesCursorPagination)
 from .filter import TitleFilter
 from .utils import send_mail
 
@@ -68,15 +84,69 @@ class GenreViewSet(CategoryGenreBaseViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+class TitleViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly, )
     pagination_class = LimitOffsetPagination
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
+    sparse_columns = {'score_distribution': SCORE_FIELDS.values()}
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
+        return TitleSerializer
+
+    @action(detail=True, url_path='score-distribution')
+    def score_distribution(self, request, pk=None):
+        return self.conditional(self.get_score_distribution, request, pk)
+
+    def get_score_distribution(self, request, pk):
+        title = get_object_or_404(
+            Title.objects.only('rating', 'rating_count',
+                               *SCORE_FIELDS.values()),
+            pk=pk)
+        return Response(ScoreDistributionSerializer(title).data)
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        return self.conditional(self.get_top, request)
+
+    def get_top_rankings(self):
+        """Строки рейтинга с учётом `?genre=`, `?category=`, `?min_reviews=`.
+
+        Без жанра берутся общие строки рейтинга (`genre IS NULL`), так что
+        каждое произведение встречается в выдаче один раз.
+        """
+        params = self.request.query_params
+        min_reviews = params.get('min_reviews', '1')
+        if (not min_reviews.isdigit()
+                or not 1 <= int(min_reviews) <= MAX_ID):
+            raise ValidationError({'min_reviews': [
+                f'Ожидается целое число от 1 до {MAX_ID}.']})
+        rankings = TitleRanking.objects.filter(
+            rating_count__gte=int(min_reviews))
+        if params.get('genre'):
+            rankings = rankings.filter(genre__slug=params['genre'])
+        else:
+            rankings = rankings.filter(genre__isnull=True)
+        if params.get('category'):
+            rankings = rankings.filter(category__slug=params['category'])
+        return rankings.select_related('title__category').prefetch_related(
+            'title__genre')
+
+    def get_top(self, request):
+        """Произведения по убыванию рейтинга, затем числа оценок."""
+        paginator = TopTitlesCursorPagination()
+        page = paginator.paginate_queryset(
+            self.get_top_rankings(), request, self)
+        serializer = self.get_serializer(
+            [ranking.title for ranking in page], many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def perform_create(self, serializer):
         category = get_object_or_404(
@@ -90,43 +160,235 @@ class TitleViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         self.perform_create(serializer)
 
+    def get_condition_scope(self):
+        return TITLES_SCOPE
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        if 'ids' not in request.query_params:
+            self.facets = self.get_requested_facets()
+            return super().list(request, *args, **kwargs)
+        return self.conditional(self.list_by_ids, request, *args, **kwargs)
+
+    def get_requested_facets(self):
+        """Фасеты из `?facets=genre,year`; пустое значение — все."""
+        value = self.request.query_params.get('facets')
+        if value is None:
+            return []
+        names = [name for name in value.split(',') if name] or list(FACETS)
+        unknown = sorted(set(names) - set(FACETS))
+        if unknown:
+            raise ValidationError({'facets': [
+                f'Неизвестные фасеты: {", ".join(unknown)}. Доступны: '
+                f'{", ".join(FACETS)}.']})
+        return list(dict.fromkeys(names))
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        facets = getattr(self, 'facets', None)
+        if facets:
+            response.data['facets'] = get_facets(
+                self.request.query_params, facets,
+                getattr(self, 'data_version', None))
+        return response
+
+    def get_requested_ids(self):
+        try:
+            ids = [int(value) for value in
+                   self.request.query_params['ids'].split(',') if value]
+        except ValueError:
+            raise ValidationError(
+                {'ids': ['Перечислите id произведений через запятую.']})
+        if any(abs(pk) > MAX_ID for pk in ids):
+            raise ValidationError(
+                {'ids': [f'Id не может быть больше {MAX_ID}.']})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.TITLES_MAX_IDS:
+            raise ValidationError({'ids': [
+                f'Можно запросить не больше {settings.TITLES_MAX_IDS} '
+                'произведений.']})
+        return ids
+
+    def list_by_ids(self, request, *args, **kwargs):
+        """Произведения по `?ids=1,2,3` в порядке запроса."""
+        ids = self.get_requested_ids()
+        titles = self.sparse_queryset(self.get_queryset()).in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in titles],
+        })
+
+
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorOrReadOnly]
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_title(self):
-        title_id = self.kwargs['title_id']
-        return get_object_or_404(Title, id=title_id)
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
         title = self.get_title()
-        return title.reviews.all()
+        return title.reviews.select_related('author')
+
+    def get_condition_scope(self):
+        return reviews_scope(self.get_title().id)
 
     def perform_create(self, serializer):
         title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(
+            author=get_user_instance(self.request.user), title=title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrReadOnly]
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_review(self):
-        review_id = self.kwargs['review_id']
-        title_id = self.kwargs['title_id']
-        return get_object_or_404(Review, id=review_id, title_id=title_id)
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id']
+            )
+        return self._review
 
     def get_queryset(self):
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related('author')
+
+    def get_condition_scope(self):
+        return comments_scope(self.get_review().id)
 
     def perform_create(self, serializer):
         review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author=get_user_instance(self.request.user), review=review)
+
+
+def build_bulk_reviews(items, author_id, results):
+    """Отзывы для вставки по индексам элементов запроса.
+
+    Произведения и уже оставленные отзывы выбираются двумя запросами;
+    ошибки записываются в `results`.
+    """
+    title_ids = set(Title.objects.filter(
+        pk__in={item['title_id'] for item in items.values()}
+    ).values_list('pk', flat=True))
+    reviewed = set(Review.objects.filter(
+        author_id=author_id, title_id__in=title_ids
+    ).values_list('title_id', flat=True))
+    reviews = {}
+    for index, item in items.items():
+        title_id = item['title_id']
+        if title_id not in title_ids:
+            results[index].update(
+                status=status.HTTP_404_NOT_FOUND,
+                errors={'title_id': ['Произведение не найдено.']})
+        elif title_id in reviewed:
+            results[index].update(
+                status=status.HTTP_400_BAD_REQUEST,
+                errors={'title_id': [
+                    'Отзыв на это произведение уже существует.']})
+        else:
+            reviewed.add(title_id)
+            reviews[index] = Review(author_id=author_id, **item)
+    return reviews
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_reviews(request):
+    """Создаёт отзывы текущего пользователя пакетом.
+
+    Ответ содержит результат для каждого элемента в порядке запроса:
+    статус 201 и id отзыва либо статус ошибки и её описание.
+    """
+    if not isinstance(request.data, list):
+        raise ValidationError('Ожидается список отзывов.')
+    if len(request.data) > settings.BULK_REVIEWS_MAX_ITEMS:
+        raise ValidationError(
+            'В одном запросе не больше '
+            f'{settings.BULK_REVIEWS_MAX_ITEMS} отзывов.')
+    results = [{'index': index} for index in range(len(request.data))]
+    items = {}
+    for index, item in enumerate(request.data):
+        serializer = BulkReviewSerializer(data=item)
+        if serializer.is_valid():
+            items[index] = serializer.validated_data
+        else:
+            results[index].update(
+                status=status.HTTP_400_BAD_REQUEST, errors=serializer.errors)
+
+    author_id = request.user.pk
+    try:
+        with transaction.atomic():
+            reviews = build_bulk_reviews(items, author_id, results)
+            Review.objects.bulk_create(reviews.values())
+            # Отзыв автора на произведение один, поэтому на каждое
+            # произведение приходится одно обновление рейтинга.
+            for review in reviews.values():
+                Title.apply_score_change(
+                    review.title_id, new_score=review.score,
+                    sync_ranking=False)
+            TitleRanking.sync_ratings(
+                [review.title_id for review in reviews.values()])
+            review_ids = dict(Review.objects.filter(
+                author_id=author_id,
+                title_id__in=[review.title_id for review in reviews.values()]
+            ).values_list('title_id', 'pk'))
+    except IntegrityError:
+        raise ValidationError(
+            'Отзывы изменились во время загрузки, повторите запрос.')
+    for index, review in reviews.items():
+        results[index].update(
+            status=status.HTTP_201_CREATED, id=review_ids[review.title_id])
+    if reviews:
+        invalidate(TITLES_SCOPE, *(
+            reviews_scope(review.title_id) for review in reviews.values()))
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export(request, resource):
+    """Выгружает всю таблицу в NDJSON потоком, по строке на объект.
+
+    `?since=<дата ISO 8601>` — только отзывы и комментарии не старше даты,
+    `?after_id=<id>` — продолжение прерванной выгрузки.
+    Доступна только под WSGI (см. `api_yamdb.urls_asgi`).
+    """
+    model, export_rows, since_field = EXPORTS[resource]
+    queryset = model.objects.all()
+    since = request.query_params.get('since')
+    if since is not None:
+        since_date = parse_since(since) if since_field else None
+        if since_date is None:
+            raise ValidationError({'since': [
+                'Фильтр доступен для отзывов и комментариев; ожидается '
+                'дата в формате ISO 8601.']})
+        queryset = queryset.filter(**{f'{since_field}__gte': since_date})
+    after_id = request.query_params.get('after_id')
+    if after_id is not None:
+        if not after_id.isdigit() or int(after_id) > MAX_ID:
+            raise ValidationError({'after_id': [
+                f'Ожидается целое число не больше {MAX_ID}.']})
+        queryset = queryset.filter(pk__gt=int(after_id))
+    response = StreamingHttpResponse(
+        to_ndjson(export_rows(queryset)),
+        content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{resource}.ndjson"')
+    return response
 
 
 @api_view(['POST'])
@@ -136,16 +398,21 @@ def get_code(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data['username']
     email = serializer.validated_data['email']
-    if User.objects.filter(username=username, email=email).exists():
-        send_mail(User.objects.get(username=username, email=email))
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    serializer = NewRegistrationSerializer(data=request.data)
+    existing_users = list(
+        User.objects.filter(Q(username=username) | Q(email=email))[:2])
+    for user in existing_users:
+        if user.username == username and user.email == email:
+            send_mail(user)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+    serializer = NewRegistrationSerializer(
+        data=request.data, context={'existing_users': existing_users})
     serializer.is_valid(raise_exception=True)
-    serializer.save()
-    send_mail(User.objects.get(
-        username=serializer.validated_data['username'],
-        email=serializer.validated_data['email']
-    ))
+    try:
+        user = serializer.save()
+    except IntegrityError:
+        raise ValidationError(
+            'Пользователь с таким username или email уже существует.')
+    send_mail(user)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -159,7 +426,7 @@ def get_token(request):
     if dtg.check_token(
         user, serializer.validated_data['confirmation_code']
     ):
-        token = AccessToken.for_user(user)
+        token = ClaimsAccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -182,12 +449,13 @@ class UserViewSet(ModelViewSet):
         serializer_class=UserSelfSerializer
     )
     def user_own_profile(self, request):
+        user = get_user_instance(request.user)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True)
+                user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
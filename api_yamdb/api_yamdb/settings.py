@@ -24,6 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.AsgiUrlconfMiddleware',
+    'api.middleware.QueryCountMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -34,6 +37,10 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
+# Под ASGI: те же маршруты, чтение произведений, отзывов и комментариев
+# идёт в пуле из ASYNC_READ_WORKERS потоков.
+ASGI_URLCONF = 'api_yamdb.urls_asgi'
+ASYNC_READ_WORKERS = 8
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -61,6 +68,34 @@ DATABASES = {
     }
 }
 
+# Кеш ответов списков и фасетов. Ключи содержат версию данных из БД
+# (`reviews.DataVersion`), поэтому запись в одном воркере сразу делает
+# устаревшими записи во всех: кеш в памяти процесса корректен, но каждый
+# воркер заполняет его сам. В продакшене с несколькими воркерами лучше
+# общий бэкенд, например memcached:
+#     'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+#     'LOCATION': '127.0.0.1:11211',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    }
+}
+
+LIST_CACHE_ALIAS = 'default'
+LIST_CACHE_TIMEOUT = 60 * 15
+
+# Допустимые число запросов к БД и время в БД (мс) на один запрос к виду;
+# превышения пишутся в лог `api.middleware`.
+QUERY_BUDGETS = {
+    'default': (10, 100),
+}
+
+# Доля запросов к API, профилируемых в фоне со сводкой в лог, и сколько
+# самых дорогих функций включать в сводку.
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_TOP = 20
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,6 +133,12 @@ AUTH_USER_MODEL = 'reviews.User'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'send_emails'
 
+# Письма с кодом подтверждения ставятся в очередь и отправляются командой
+# `python manage.py send_emails`; без запущенной команды письма не уйдут.
+EMAIL_OUTBOX_ENABLED = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -106,7 +147,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
 }
 
@@ -115,6 +156,18 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Наибольшее число отзывов в одном запросе к /api/v1/reviews/bulk/.
+BULK_REVIEWS_MAX_ITEMS = 1000
+
+# Наибольшее число произведений в запросе /api/v1/titles/?ids=1,2,3.
+TITLES_MAX_IDS = 100
+
+# Сколько строк читать из БД за раз при выгрузке /api/v1/export/.
+EXPORT_CHUNK_SIZE = 2000
+
+# Сколько проверенных access-токенов держать в памяти процесса.
+ACCESS_TOKEN_CACHE_SIZE = 10000
+
 DOMAIN_NAME = 'yamdb.com'
 NOREPLY_EMAIL = 'noreply@' + DOMAIN_NAME
 DEFAULT_FROM_EMAIL = NOREPLY_EMAIL
@@ -0,0 +1,22 @@
+"""URL-конфигурация для ASGI: те же маршруты с асинхронными видами.
+
+Подключается `api.middleware.AsgiUrlconfMiddleware`.
+"""
+from api.async_views import with_async_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+# Чтение этих маршрутов идёт в пуле потоков, а не в общем потоке Django.
+POOLED_ROUTES = {
+    'titles-list', 'titles-detail', 'titles-score-distribution',
+    'titles-top',
+    'review-list', 'review-detail',
+    'comment-list', 'comment-detail',
+}
+
+# Только под WSGI. Django 3.2 читает StreamingHttpResponse прямо в цикле
+# событий, а выгрузка обращается к БД, пока отдаёт ответ.
+WSGI_ONLY_ROUTES = {'export'}
+
+urlpatterns = with_async_views(
+    sync_urlpatterns, POOLED_ROUTES, WSGI_ONLY_ROUTES)
@@ -0,0 +1,44 @@
+from django.db import models
+from django.db.models import Q
+
+# Символ с наибольшим кодом: верхняя граница диапазона для поиска по префиксу.
+MAX_CHAR = '\U0010ffff'
+
+
+def fold(value):
+    """Приводит строку к виду для поиска: casefold и замена «ё» на «е»."""
+    return value.casefold().replace('ё', 'е')
+
+
+def prefix_q(field_name, prefix):
+    """Поиск по префиксу диапазоном, который использует обычный индекс."""
+    return Q(**{
+        f'{field_name}__gte': prefix,
+        f'{field_name}__lt': prefix + MAX_CHAR,
+    })
+
+
+class FoldedCharField(models.CharField):
+    """Индексируемая копия поля `source` в нормализованном виде.
+
+    Значение вычисляется в `pre_save`, поэтому заполняется и при
+    `bulk_create`.
+    """
+
+    def __init__(self, source, *args, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 512)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = fold(getattr(model_instance, self.source) or '')
+        setattr(model_instance, self.attname, value)
+        return value
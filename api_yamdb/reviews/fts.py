@@ -0,0 +1,90 @@
+"""Полнотекстовый индекс FTS5 по названию и описанию произведений (SQLite).
+
+Таблица `reviews_title_fts` не хранит собственного содержимого: триггеры
+кладут в неё текст с заменой «ё» на «е», которую не делает токенизатор
+unicode61. SQLite теряет триггеры при пересоздании таблицы в миграциях,
+поэтому триггеры восстанавливаются после каждого `migrate`.
+"""
+
+
+def normalized(column):
+    return f"replace(replace(coalesce({column}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+def fts_values(row):
+    return (f"{row}.id, {normalized(f'{row}.name')}, "
+            f"{normalized(f'{row}.description')}")
+
+
+CREATE_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5(
+        name, description, content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+INSERT_SQL = (
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES ({values});'
+)
+DELETE_SQL = (
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', {values});"
+)
+
+TRIGGERS = {
+    'reviews_title_fts_insert': (
+        'AFTER INSERT ON reviews_title',
+        INSERT_SQL.format(values=fts_values('new')),
+    ),
+    'reviews_title_fts_delete': (
+        'AFTER DELETE ON reviews_title',
+        DELETE_SQL.format(values=fts_values('old')),
+    ),
+    'reviews_title_fts_update': (
+        'AFTER UPDATE OF name, description ON reviews_title',
+        DELETE_SQL.format(values=fts_values('old'))
+        + INSERT_SQL.format(values=fts_values('new')),
+    ),
+}
+
+REBUILD_SQL = (
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('delete-all')",
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    f"SELECT {fts_values('reviews_title')} FROM reviews_title",
+)
+
+
+def install(connection, create=True):
+    """Создаёт индекс и недостающие триггеры; при потере триггеров
+    перестраивает индекс. Ничего не делает на СУБД, отличных от SQLite.
+
+    С `create=False` только чинит уже существующий индекс.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    if (not create and 'reviews_title_fts'
+            not in connection.introspection.table_names()):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'reviews_title'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = set(TRIGGERS) - existing
+        for name in missing:
+            event, body = TRIGGERS[name]
+            cursor.execute(f'CREATE TRIGGER {name} {event} BEGIN {body} END')
+        if missing:
+            for sql in REBUILD_SQL:
+                cursor.execute(sql)
+
+
+def uninstall(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute('DROP TABLE IF EXISTS reviews_title_fts')
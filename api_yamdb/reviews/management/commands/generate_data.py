@@ -0,0 +1,188 @@
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.management.bulk import batched, keep_pub_date, reset_sequences
+from reviews.models import (Category, Comment, DataVersion, Genre, Review,
+                            Title, User)
+
+# Объёмы при --scale 1; отзывов получается около 80 тысяч.
+BASE_USERS = 10000
+BASE_TITLES = 2000
+CATEGORIES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра')
+GENRES = (
+    'Драма', 'Комедия', 'Вестерн', 'Фэнтези', 'Фантастика', 'Детектив',
+    'Триллер', 'Сказка', 'Гонзо', 'Ужасы', 'Боевик', 'Мелодрама', 'Роман',
+    'Приключения', 'Рок', 'Шансон', 'Классика', 'Джаз', 'Документальный',
+    'Мультфильм',
+)
+WORDS = (
+    'отличный', 'фильм', 'книга', 'сюжет', 'герой', 'финал', 'музыка',
+    'скучно', 'великолепно', 'рекомендую', 'автор', 'жанр', 'смотреть',
+    'читать', 'слушать', 'снова', 'никогда', 'лучший', 'худший', 'эпоха',
+    'характер', 'история', 'режиссёр', 'актёр', 'ёмкий', 'ёлка', 'время',
+)
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 10 * 365 * 24 * 3600
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные: число отзывов на произведение '
+            'распределено по закону Ципфа, комментарии образуют цепочки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', default=1.0, type=float,
+            help='Множитель объёма данных.')
+        parser.add_argument(
+            '--zipf', default=1.0, type=float,
+            help='Показатель распределения Ципфа для отзывов.')
+        parser.add_argument(
+            '--comments', default=1.5, type=float,
+            help='Среднее число комментариев к отзыву.')
+        parser.add_argument(
+            '--seed', default=0, type=int,
+            help='Зерно генератора случайных чисел.')
+        parser.add_argument(
+            '--batch-size', default=5000, type=int,
+            help='Количество строк в одном INSERT.')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0 or options['batch_size'] < 1:
+            raise CommandError(
+                '--scale и --batch-size должны быть положительными.')
+        self.rng = random.Random(options['seed'])
+        # Отдельный генератор: комментарии не зависят от размера пакета.
+        self.comment_rng = random.Random(f'{options["seed"]}:comments')
+        self.batch_size = options['batch_size']
+        users = max(int(BASE_USERS * options['scale']), 2)
+        titles = max(int(BASE_TITLES * options['scale']), 1)
+
+        categories = self.ensure(Category, CATEGORIES)
+        genres = self.ensure(Genre, GENRES)
+        user_ids = self.id_range(User, users)
+        self.insert(User, self.build_users(user_ids))
+        title_ids = self.id_range(Title, titles)
+        self.insert(Title, self.build_titles(title_ids, categories))
+        self.insert(Title.genre.through, self.build_genres(title_ids, genres))
+        review_count = comment_count = 0
+        comment_ids = itertools.count(self.next_id(Comment))
+        with keep_pub_date(Review, Comment):
+            # Комментарии пишутся сразу за своим пакетом отзывов: в памяти
+            # не копится ничего, кроме текущего пакета.
+            for reviews in batched(self.build_reviews(
+                    title_ids, user_ids, options['zipf']), self.batch_size):
+                review_count += self.insert(Review, reviews)
+                comment_count += self.insert(Comment, self.build_comments(
+                    reviews, user_ids, options['comments'], comment_ids))
+        reset_sequences([User, Title, Review, Comment])
+        for batch in batched(title_ids, self.batch_size):
+            Title.recalculate_ratings(batch)
+        # Записи шли в обход сигналов: сбрасываем кеш и ETag всех ответов.
+        DataVersion.bump(DataVersion.ALL)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, произведений '
+            f'{len(title_ids)}, отзывов {review_count}, комментариев '
+            f'{comment_count}.'
+        ))
+
+    def ensure(self, model, names):
+        existing = set(model.objects.values_list('slug', flat=True))
+        model.objects.bulk_create(
+            model(name=name, slug=f'gen-{index}')
+            for index, name in enumerate(names)
+            if f'gen-{index}' not in existing
+        )
+        return list(model.objects.filter(
+            slug__startswith='gen-').values_list('id', flat=True))
+
+    def insert(self, model, objects):
+        """Вставляет объекты пакетами, каждый в своей транзакции.
+
+        Возвращает число вставленных объектов.
+        """
+        total = 0
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            total += len(batch)
+        return total
+
+    def id_range(self, model, count):
+        """Id новых объектов: диапазон, а не список, не занимает памяти."""
+        first_id = self.next_id(model)
+        return range(first_id, first_id + count)
+
+    def next_id(self, model):
+        return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+    def random_date(self):
+        return START_DATE + timedelta(
+            seconds=self.rng.randrange(PERIOD_SECONDS))
+
+    def text(self, median_words, rng=None):
+        rng = rng or self.rng
+        count = max(1, int(rng.lognormvariate(0, 0.8) * median_words))
+        return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+    def build_users(self, user_ids):
+        password = make_password(None)
+        for user_id in user_ids:
+            yield User(id=user_id, username=f'gen_user{user_id}',
+                       email=f'gen_user{user_id}@yamdb.fake',
+                       password=password)
+
+    def build_titles(self, title_ids, categories):
+        for title_id in title_ids:
+            yield Title(
+                id=title_id,
+                name=f'{self.rng.choice(WORDS).capitalize()} {title_id}',
+                year=self.rng.randint(1900, 2024),
+                category_id=self.rng.choice(categories),
+                description=self.text(30)
+            )
+
+    def build_genres(self, title_ids, genres):
+        through = Title.genre.through
+        for title_id in title_ids:
+            for genre_id in self.rng.sample(genres, self.rng.randint(1, 3)):
+                yield through(title_id=title_id, genre_id=genre_id)
+
+    def build_reviews(self, title_ids, user_ids, exponent):
+        """Отзывы на произведение ранга r: len(user_ids) / r ** exponent."""
+        ranked = list(title_ids)
+        self.rng.shuffle(ranked)
+        review_id = self.next_id(Review)
+        for rank, title_id in enumerate(ranked, 1):
+            count = max(1, int(len(user_ids) / rank ** exponent))
+            for author_id in self.rng.sample(user_ids, count):
+                yield Review(
+                    id=review_id, title_id=title_id, author_id=author_id,
+                    text=self.text(40),
+                    score=min(10, max(1, round(self.rng.gauss(7, 2)))),
+                    pub_date=self.random_date()
+                )
+                review_id += 1
+
+    def build_comments(self, reviews, user_ids, mean, comment_ids):
+        """Цепочки: автор отзыва и собеседник отвечают друг другу."""
+        rng = self.comment_rng
+        stop = 1 / (1 + mean)
+        for review in reviews:
+            speakers = (rng.choice(user_ids), review.author_id)
+            pub_date = review.pub_date
+            position = 0
+            while rng.random() > stop:
+                pub_date += timedelta(
+                    seconds=rng.randrange(60, 3 * 24 * 3600))
+                yield Comment(
+                    id=next(comment_ids), review_id=review.id,
+                    author_id=speakers[position % 2],
+                    text=self.text(15, rng), pub_date=pub_date
+                )
+                position += 1
@@ -0,0 +1,123 @@
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.management.bulk import batched, keep_pub_date, reset_sequences
+from reviews.models import (Category, Comment, DataVersion, Genre, Review,
+                            Title, User)
+
+DEFAULT_DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+DEFAULT_BATCH_SIZE = 1000
+
+# Файл, модель и внешние ключи: колонка CSV -> (поле модели, модель).
+CSV_FILES = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': ('category_id', Category)}),
+    ('genre_title.csv', Title.genre.through, {
+        'title_id': ('title_id', Title),
+        'genre_id': ('genre_id', Genre),
+    }),
+    ('review.csv', Review, {
+        'title_id': ('title_id', Title),
+        'author': ('author_id', User),
+    }),
+    ('comments.csv', Comment, {
+        'review_id': ('review_id', Review),
+        'author': ('author_id', User),
+    }),
+)
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        yield from csv.DictReader(csv_file)
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в базу пакетами bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_DATA_DIR, type=Path,
+            help='Каталог с CSV-файлами.')
+        parser.add_argument(
+            '--batch-size', default=DEFAULT_BATCH_SIZE, type=int,
+            help='Количество строк в одном INSERT.')
+
+    def handle(self, *args, **options):
+        data_dir = options['path']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        self.known_ids = {}
+        with keep_pub_date(Review, Comment):
+            for filename, model, foreign_keys in CSV_FILES:
+                path = data_dir / filename
+                if not path.exists():
+                    self.stdout.write(f'{filename}: файл не найден, пропуск.')
+                    continue
+                created, skipped = self.load_file(
+                    path, model, foreign_keys, batch_size)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{filename}: загружено {created}, пропущено {skipped}.'
+                ))
+        reset_sequences([model for _, model, _ in CSV_FILES])
+        Title.recalculate_ratings()
+        # Записи шли в обход сигналов: сбрасываем кеш и ETag всех ответов.
+        DataVersion.bump(DataVersion.ALL)
+
+    def get_known_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True))
+        return self.known_ids[model]
+
+    @staticmethod
+    def resolve_row(row, foreign_keys, fk_ids):
+        """Поля объекта из строки CSV или None, если нет связанной записи."""
+        fields = {}
+        for column, value in row.items():
+            if value == '':
+                continue
+            if column not in foreign_keys:
+                fields[column] = value
+                continue
+            related_id = int(value)
+            if related_id not in fk_ids[column]:
+                return None
+            fields[foreign_keys[column][0]] = related_id
+        fields['id'] = int(fields['id'])
+        return fields
+
+    def build_objects(self, rows, model, foreign_keys, stats):
+        fk_ids = {
+            column: self.get_known_ids(related)
+            for column, (_, related) in foreign_keys.items()
+        }
+        loaded_ids = self.get_known_ids(model)
+        for row in rows:
+            fields = self.resolve_row(row, foreign_keys, fk_ids)
+            if fields is None or fields['id'] in loaded_ids:
+                stats['skipped'] += 1
+                continue
+            if model is User:
+                fields['password'] = make_password(None)
+            yield model(**fields)
+
+    def load_file(self, path, model, foreign_keys, batch_size):
+        stats = {'created': 0, 'skipped': 0}
+        objects = self.build_objects(
+            read_rows(path), model, foreign_keys, stats)
+        loaded_ids = self.get_known_ids(model)
+        with transaction.atomic():
+            for batch in batched(objects, batch_size):
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                loaded_ids.update(obj.pk for obj in batch)
+                stats['created'] += len(batch)
+        return stats['created'], stats['skipped']
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# SQL зафиксирован здесь, а не импортируется из reviews.fts: миграция должна
+# выполняться одинаково при любых последующих правках приложения. Триггеры,
+# потерянные при пересоздании таблицы, восстанавливает post_migrate.
+NORMALIZED = "replace(replace(coalesce({}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+def fts_values(row):
+    return (f'{row}.id, {NORMALIZED.format(f"{row}.name")}, '
+            f'{NORMALIZED.format(f"{row}.description")}')
+
+
+INSERT_SQL = (
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES ({values});'
+)
+DELETE_SQL = (
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', {values});"
+)
+
+INSTALL_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5(
+        name, description, content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    'CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title '
+    f"BEGIN {INSERT_SQL.format(values=fts_values('new'))} END",
+    'CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title '
+    f"BEGIN {DELETE_SQL.format(values=fts_values('old'))} END",
+    'CREATE TRIGGER reviews_title_fts_update '
+    'AFTER UPDATE OF name, description ON reviews_title '
+    f"BEGIN {DELETE_SQL.format(values=fts_values('old'))}"
+    f"{INSERT_SQL.format(values=fts_values('new'))} END",
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    f"SELECT {fts_values('reviews_title')} FROM reviews_title",
+]
+
+UNINSTALL_SQL = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(INSTALL_SQL), run_on_sqlite(UNINSTALL_SQL)),
+    ]
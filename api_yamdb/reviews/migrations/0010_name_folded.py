@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 03:13
+
+from django.db import migrations
+import reviews.fields
+
+
+def fill_name_folded(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('id', 'name'))
+        for obj in objects:
+            obj.name_folded = reviews.fields.fold(obj.name)
+        model.objects.bulk_update(objects, ['name_folded'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_folded',
+            field=reviews.fields.FoldedCharField(db_index=True, default='', editable=False, max_length=512, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_folded',
+            field=reviews.fields.FoldedCharField(db_index=True, default='', editable=False, max_length=512, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_folded',
+            field=reviews.fields.FoldedCharField(db_index=True, default='', editable=False, max_length=512, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(fill_name_folded, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-18 03:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FILL_SQL = [
+    'INSERT INTO reviews_titleranking '
+    '(title_id, genre_id, category_id, rating, rating_count) '
+    'SELECT t.id, NULL, t.category_id, t.rating, t.rating_count '
+    'FROM reviews_title t',
+    'INSERT INTO reviews_titleranking '
+    '(title_id, genre_id, category_id, rating, rating_count) '
+    'SELECT t.id, g.genre_id, t.category_id, t.rating, t.rating_count '
+    'FROM reviews_title t '
+    'JOIN reviews_title_genre g ON g.title_id = t.id',
+]
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('rating_count', models.PositiveIntegerField(default=0, verbose_name='Количество оценок')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', '-rating', '-rating_count', 'title'], name='ranking_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', '-rating', '-rating_count', 'title'], name='ranking_genre_category_idx'),
+        ),
+        migrations.RunSQL(FILL_SQL, migrations.RunSQL.noop),
+    ]
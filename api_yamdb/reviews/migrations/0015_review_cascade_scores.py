@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 04:00
+
+from django.conf import settings
+from django.db import migrations, models
+import reviews.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_dataversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='author',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_author_reviews, related_name='reviews', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_title_reviews, related_name='reviews', to='reviews.title', verbose_name='Произведение'),
+        ),
+    ]
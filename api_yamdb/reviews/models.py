@@ -1,12 +1,33 @@
+import re
+import time
+from collections import Counter, defaultdict
+
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-
+from django.db import connection, models, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, Max,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.utils import timezone
+
+from .fields import FoldedCharField
 from .validators import characters_validator, year_validator
 
 # Константы для магических чисел
 MIN_SCORE = 1
 MAX_SCORE = 10
+# Наибольший id BigAutoField; большие значения не помещаются в INTEGER БД.
+MAX_ID = 2 ** 63 - 1
+# Поле Title со счётчиком отзывов для каждой оценки.
+SCORE_FIELDS = {
+    score: f'score_{score}' for score in range(MIN_SCORE, MAX_SCORE + 1)
+}
+
+
+def score_counter(score):
+    return models.PositiveIntegerField(
+        default=0, verbose_name=f'Оценок «{score}»')
 
 
 class User(AbstractUser):
@@ -58,6 +79,10 @@ class Category(models.Model):
         verbose_name='Название',
         help_text='Название категории',
     )
+    name_folded = FoldedCharField(
+        source='name',
+        verbose_name='Название для поиска'
+    )
     slug = models.SlugField(
         max_length=50,
         unique=True,
@@ -82,6 +107,10 @@ class Genre(models.Model):
         verbose_name='Название',
         help_text='Название жанра',
     )
+    name_folded = FoldedCharField(
+        source='name',
+        verbose_name='Название для поиска'
+    )
     slug = models.SlugField(
         max_length=50,
         unique=True,
@@ -97,6 +126,41 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    FTS_MATCH_SQL = (
+        'SELECT rowid FROM reviews_title_fts '
+        'WHERE reviews_title_fts MATCH %s'
+    )
+    FTS_RANK_SQL = (
+        'SELECT bm25(reviews_title_fts, 10.0, 1.0) FROM reviews_title_fts '
+        'WHERE reviews_title_fts MATCH %s AND rowid = reviews_title.id'
+    )
+
+    @staticmethod
+    def build_fts_query(text):
+        """Превращает ввод пользователя в безопасный префиксный запрос."""
+        words = re.findall(r'\w+', text.replace('ё', 'е').replace('Ё', 'Е'))
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, text):
+        """Полнотекстовый поиск по названию и описанию с ранжированием.
+
+        На SQLite используется индекс FTS5 `reviews_title_fts`,
+        на остальных СУБД — поиск подстроки в названии.
+        """
+        query = self.build_fts_query(text)
+        if not query:
+            return self
+        if connection.vendor != 'sqlite':
+            return self.filter(name__icontains=text)
+        return self.filter(
+            id__in=RawSQL(self.FTS_MATCH_SQL, (query,))
+        ).annotate(
+            search_rank=RawSQL(self.FTS_RANK_SQL, (query,))
+        ).order_by('search_rank', 'name')
+
+
 class Title(models.Model):
     """Произведение, связанное с категорией и жанром."""
 
@@ -105,6 +169,10 @@ class Title(models.Model):
         verbose_name='Название',
         help_text='Выберите название произведения'
     )
+    name_folded = FoldedCharField(
+        source='name',
+        verbose_name='Название для поиска'
+    )
     year = models.PositiveSmallIntegerField(
         validators=[year_validator],
         verbose_name='Год',
@@ -131,6 +199,33 @@ class Title(models.Model):
         null=True,
         verbose_name='Описание'
     )
+    rating = models.FloatField(
+        blank=True,
+        null=True,
+        default=None,
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок'
+    )
+    score_1 = score_counter(1)
+    score_2 = score_counter(2)
+    score_3 = score_counter(3)
+    score_4 = score_counter(4)
+    score_5 = score_counter(5)
+    score_6 = score_counter(6)
+    score_7 = score_counter(7)
+    score_8 = score_counter(8)
+    score_9 = score_counter(9)
+    score_10 = score_counter(10)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
@@ -140,6 +235,248 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def change_scores(cls, titles, score_delta, count_delta, counters):
+        """Меняет сумму, количество, рейтинг и распределение оценок.
+
+        Один UPDATE для всех `titles`; `counters` — шаги полей
+        распределения, например `{'score_7': -1}`.
+        """
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        titles.update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=Value(None)),
+                default=(Cast(new_sum, FloatField())
+                         / Cast(new_count, FloatField())),
+                output_field=FloatField()
+            ),
+            **{field: F(field) + step for field, step in counters.items()}
+        )
+
+    @classmethod
+    def apply_score_change(cls, title_id, old_score=None, new_score=None,
+                           sync_ranking=True):
+        """Атомарно учитывает новую, изменённую или удалённую оценку.
+
+        Сумма, количество, рейтинг и распределение оценок меняются
+        одним UPDATE, вторым — строки `TitleRanking`. С
+        `sync_ranking=False` рейтинг для топа вызывающий синхронизирует
+        сам, например одним запросом для пакета произведений.
+        """
+        if old_score == new_score:
+            return
+        counters = {}
+        for score, step in ((old_score, -1), (new_score, 1)):
+            if score in SCORE_FIELDS:
+                counters[SCORE_FIELDS[score]] = step
+        cls.change_scores(
+            cls.objects.filter(pk=title_id),
+            (new_score or 0) - (old_score or 0),
+            (new_score is not None) - (old_score is not None),
+            counters)
+        if sync_ranking:
+            TitleRanking.sync_ratings([title_id])
+
+    @classmethod
+    def remove_scores(cls, scores):
+        """Вычитает оценки удалённых отзывов: пары (id произведения, оценка).
+
+        Произведения с одинаковыми оценками обновляются общим UPDATE,
+        поэтому запросов не больше, чем разных оценок, плюс один для
+        `TitleRanking`, сколько бы отзывов ни было удалено.
+        """
+        groups = defaultdict(list)
+        for (title_id, score), count in Counter(scores).items():
+            groups[score, count].append(title_id)
+        for (score, count), title_ids in groups.items():
+            cls.change_scores(
+                cls.objects.filter(pk__in=title_ids), -score * count,
+                -count, {SCORE_FIELDS[score]: -count})
+        TitleRanking.sync_ratings(
+            [title_id for title_ids in groups.values()
+             for title_id in title_ids])
+
+    @classmethod
+    def recalculate_ratings(cls, title_ids=None):
+        """Пересчитывает рейтинги и распределение оценок одним UPDATE.
+
+        Нужен после массовых вставок и для исправления расхождений.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        titles = cls.objects.all()
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+        updated = titles.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(count=Count('id')).values('count')),
+                0),
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg'),
+                output_field=FloatField()),
+            **{
+                field: Coalesce(Subquery(
+                    reviews.filter(score=score)
+                    .annotate(count=Count('id')).values('count')), 0)
+                for score, field in SCORE_FIELDS.items()
+            }
+        )
+        TitleRanking.refresh(title_ids)
+        return updated
+
+    @property
+    def score_distribution(self):
+        """Количество отзывов с каждой оценкой: {1: ..., 10: ...}."""
+        return {
+            score: getattr(self, field)
+            for score, field in SCORE_FIELDS.items()
+        }
+
+    def recalculate_rating(self):
+        """Пересчитывает рейтинг по отзывам (исправление расхождений)."""
+        Title.recalculate_ratings([self.pk])
+        self.refresh_from_db(fields=[
+            'rating_sum', 'rating_count', 'rating', *SCORE_FIELDS.values()])
+
+
+class TitleRanking(models.Model):
+    """Материализованный рейтинг для `/api/v1/titles/top/`.
+
+    На каждое произведение приходится строка без жанра (общий рейтинг)
+    и по строке на каждый его жанр, с категорией, рейтингом и числом
+    оценок. Страница топа читается по индексу `(genre, [category,]
+    -rating, -rating_count, title)` без сортировки и соединения с
+    таблицей связей жанров. Рейтинг обновляется вместе с произведением
+    (`sync_ratings`), строки перестраиваются при изменении жанров и
+    категории (`refresh`, см. `reviews.signals`).
+    """
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        verbose_name='Жанр',
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    category = models.ForeignKey(
+        Category,
+        verbose_name='Категория',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    rating = models.FloatField(null=True, verbose_name='Рейтинг')
+    rating_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество оценок')
+
+    INSERT_SQL = (
+        'INSERT INTO reviews_titleranking '
+        '(title_id, genre_id, category_id, rating, rating_count) '
+        'SELECT t.id, NULL, t.category_id, t.rating, t.rating_count '
+        'FROM reviews_title t{where}',
+        'INSERT INTO reviews_titleranking '
+        '(title_id, genre_id, category_id, rating, rating_count) '
+        'SELECT t.id, g.genre_id, t.category_id, t.rating, t.rating_count '
+        'FROM reviews_title t '
+        'JOIN reviews_title_genre g ON g.title_id = t.id{where}',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['genre', '-rating', '-rating_count', 'title'],
+                name='ranking_genre_idx'
+            ),
+            models.Index(
+                fields=['genre', 'category', '-rating', '-rating_count',
+                        'title'],
+                name='ranking_genre_category_idx'
+            ),
+        ]
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+
+    @classmethod
+    def refresh(cls, title_ids=None):
+        """Перестраивает строки произведений `title_ids` (или всех).
+
+        Три запроса независимо от числа произведений: DELETE и два
+        INSERT ... SELECT.
+        """
+        rankings = cls.objects.all()
+        where, params = '', ()
+        if title_ids is not None:
+            title_ids = list(title_ids)
+            if not title_ids:
+                return
+            rankings = rankings.filter(title_id__in=title_ids)
+            where = ' WHERE t.id IN ({})'.format(
+                ', '.join(['%s'] * len(title_ids)))
+            params = title_ids
+        with transaction.atomic(savepoint=False):
+            rankings.delete()
+            with connection.cursor() as cursor:
+                for sql in cls.INSERT_SQL:
+                    cursor.execute(sql.format(where=where), params)
+
+    @classmethod
+    def sync_ratings(cls, title_ids):
+        """Копирует рейтинг и число оценок произведений одним UPDATE."""
+        titles = Title.objects.filter(pk=OuterRef('title_id'))
+        cls.objects.filter(title_id__in=title_ids).update(
+            rating=Subquery(titles.values('rating')),
+            rating_count=Subquery(titles.values('rating_count')),
+        )
+
+
+class RemovedScores:
+    """Оценки отзывов, удаляемых каскадом вместе с автором.
+
+    Отзывы получают общий объект в `cascade_author_reviews`; когда
+    удалён последний из них, оценки вычитаются разом
+    (`Title.remove_scores`), а не по UPDATE на каждый отзыв.
+    """
+
+    def __init__(self, reviews):
+        self.expected = len(reviews)
+        self.scores = []
+
+    def add(self, review):
+        self.scores.append((review.title_id, review.score))
+        if len(self.scores) == self.expected:
+            Title.remove_scores(self.scores)
+
+
+def cascade_title_reviews(collector, field, sub_objs, using):
+    """CASCADE для отзывов удаляемого произведения.
+
+    Помечает отзывы: вычитать их оценки из удаляемого произведения
+    незачем (см. `reviews.signals.remove_review_score`).
+    """
+    for review in sub_objs:
+        review.title_deleted = True
+    models.CASCADE(collector, field, sub_objs, using)
+
+
+def cascade_author_reviews(collector, field, sub_objs, using):
+    """CASCADE для отзывов удаляемого пользователя с общим `RemovedScores`."""
+    removed_scores = RemovedScores(sub_objs)
+    for review in sub_objs:
+        review.removed_scores = removed_scores
+    models.CASCADE(collector, field, sub_objs, using)
+
 
 class Review(models.Model):
     """Отзыв на произведение с оценкой от 1 до 10."""
@@ -147,13 +484,13 @@ class Review(models.Model):
     title = models.ForeignKey(
         Title,
         verbose_name='Произведение',
-        on_delete=models.CASCADE,
+        on_delete=cascade_title_reviews,
         related_name='reviews'
     )
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
-        on_delete=models.CASCADE,
+        on_delete=cascade_author_reviews,
         related_name='reviews'
     )
     text = models.TextField(verbose_name='Текст отзыва')
@@ -173,13 +510,40 @@ class Review(models.Model):
                 name='unique_review_title'
             )
         ]
-        ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
+        ordering = ['pub_date', 'id']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и обновляет рейтинг произведения."""
+        created = self._state.adding
+        old_score = getattr(self, '_loaded_score', None)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if created:
+                Title.apply_score_change(self.title_id, new_score=self.score)
+            elif old_score is None:
+                self.title.recalculate_rating()
+            else:
+                Title.apply_score_change(
+                    self.title_id, old_score, self.score)
+        self._loaded_score = self.score
+
 
 class Comment(models.Model):
     """Комментарий к отзыву."""
@@ -201,9 +565,111 @@ class Comment(models.Model):
                                     verbose_name='Дата добавления')
 
     class Meta:
-        ordering = ['pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
+        ordering = ['pub_date', 'id']
         verbose_name = 'Комментрий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. команду `send_emails`)."""
+
+    recipient = models.EmailField(max_length=254, verbose_name='Получатель')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст письма')
+    from_email = models.EmailField(max_length=254, verbose_name='Отправитель')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата добавления')
+    next_attempt_at = models.DateTimeField(default=timezone.now,
+                                           verbose_name='Следующая попытка')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попытки')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    sent_at = models.DateTimeField(null=True,
+                                   blank=True,
+                                   verbose_name='Дата отправки')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx'
+            )
+        ]
+        ordering = ['id']
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
+
+
+class DataVersion(models.Model):
+    """Версия области данных для кеша ответов и валидаторов HTTP.
+
+    Хранится в БД, чтобы запись в одном процессе (воркер, команда
+    управления) сразу меняла ETag и ключи кеша во всех остальных.
+    Версия — время изменения в наносекундах, но не меньше предыдущей
+    версии плюс один: она растёт и при расхождении часов процессов.
+    Строка `ALL` меняется при массовых загрузках в обход сигналов и
+    действует на все области.
+    """
+
+    ALL = '*'
+    UPSERT_SQL = (
+        'INSERT INTO reviews_dataversion (scope, version) VALUES {values} '
+        'ON CONFLICT (scope) DO UPDATE SET version = {greatest}('
+        'reviews_dataversion.version + 1, excluded.version)'
+    )
+    GREATEST = {'sqlite': 'MAX', 'postgresql': 'GREATEST'}
+
+    scope = models.CharField(max_length=100, primary_key=True,
+                             verbose_name='Область данных')
+    version = models.PositiveBigIntegerField(default=0,
+                                             verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.scope}: {self.version}'
+
+    @classmethod
+    def get(cls, scope):
+        """Версия области с учётом `ALL`; 0, если записей ещё не было."""
+        return cls.objects.filter(scope__in=(scope, cls.ALL)).aggregate(
+            version=Coalesce(Max('version'), 0))['version']
+
+    @classmethod
+    def bump(cls, *scopes):
+        """Сменяет версии областей одним запросом (UPSERT).
+
+        На СУБД без `INSERT ... ON CONFLICT` — двумя запросами.
+        """
+        scopes = list(dict.fromkeys(scopes))
+        version = time.time_ns()
+        greatest = cls.GREATEST.get(connection.vendor)
+        if greatest is None:
+            with transaction.atomic():
+                cls.objects.bulk_create(
+                    [cls(scope=scope) for scope in scopes],
+                    ignore_conflicts=True)
+                cls.objects.filter(scope__in=scopes).update(
+                    version=Greatest(F('version') + 1, Value(version)))
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                cls.UPSERT_SQL.format(
+                    values=', '.join(['(%s, %s)'] * len(scopes)),
+                    greatest=greatest),
+                [value for scope in scopes for value in (scope, version)])
@@ -0,0 +1,49 @@
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from . import fts
+from .models import Review, Title, TitleRanking
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва, в том числе при каскаде.
+
+    Отзывы удаляемого произведения пропускаются, отзывы удаляемого
+    пользователя учитываются пакетом (см. `reviews.models.RemovedScores`).
+    """
+    removed_scores = getattr(instance, 'removed_scores', None)
+    if removed_scores is not None:
+        removed_scores.add(instance)
+        return
+    if getattr(instance, 'title_deleted', False):
+        return
+    Title.apply_score_change(instance.title_id, old_score=instance.score)
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_ranking(sender, instance, **kwargs):
+    """Перестраивает строки рейтинга: могли смениться категория и оценки."""
+    TitleRanking.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_title_genre_ranking(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        TitleRanking.refresh([instance.pk])
+    elif action == 'post_clear':
+        TitleRanking.objects.filter(genre=instance).delete()
+    else:
+        TitleRanking.refresh(pk_set)
+
+
+@receiver(post_migrate)
+def install_title_fts(sender, using, **kwargs):
+    """Восстанавливает триггеры FTS после пересоздания таблицы."""
+    if sender.name == 'reviews':
+        fts.install(connections[using], create=False)
@@ -0,0 +1,315 @@
+"""Задержка, число запросов к БД и память для каждого маршрута API.
+
+    python -m benchmarks.bench_api --titles 200 --iterations 30 \\
+        --output bench.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+
+from benchmarks.utils import percentile, setup_django, test_database
+
+Scenario = namedtuple('Scenario', 'name method prepare')
+
+MEMORY_ITERATIONS = 5
+
+
+class Context:
+    """Клиенты и счётчики, общие для сценариев."""
+
+    def __init__(self):
+        from reviews.models import Review, Title, User
+
+        self.counter = 0
+        self.admin = User.objects.create_user(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role=User.Role.ADMIN)
+        self.admin_client = self.client_for(self.admin)
+        self.anon_client = self.client_for(None)
+        self.title = Title.objects.order_by('-rating_count').first()
+        self.review = Review.objects.filter(title=self.title).first()
+
+    def client_for(self, user):
+        from api.authentication import ClaimsAccessToken
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+            )
+        return client
+
+    def unique(self, prefix):
+        self.counter += 1
+        return f'{prefix}{self.counter}'
+
+    def new_user_client(self):
+        from reviews.models import User
+
+        name = self.unique('bench_author')
+        user = User.objects.create_user(
+            username=name, email=f'{name}@yamdb.fake')
+        return self.client_for(user)
+
+    @property
+    def title_url(self):
+        return f'/api/v1/titles/{self.title.id}/'
+
+    @property
+    def review_url(self):
+        return f'{self.title_url}reviews/{self.review.id}/'
+
+
+def new_user(ctx):
+    from reviews.models import User
+
+    name = ctx.unique('bench_victim')
+    return User.objects.create_user(username=name, email=f'{name}@yamdb.fake')
+
+
+def new_category(ctx):
+    from reviews.models import Category
+
+    return Category.objects.create(name='Удаляемая', slug=ctx.unique('c'))
+
+
+def new_genre(ctx):
+    from reviews.models import Genre
+
+    return Genre.objects.create(name='Удаляемый', slug=ctx.unique('g'))
+
+
+def new_title(ctx):
+    from reviews.models import Title
+
+    return Title.objects.create(name=ctx.unique('Удаляемое '), year=2000)
+
+
+def new_review(ctx):
+    from reviews.models import Review
+
+    return Review.objects.create(
+        title=ctx.title, author=new_user(ctx), text='.', score=5)
+
+
+def new_comment(ctx):
+    from reviews.models import Comment
+
+    return Comment.objects.create(
+        review=ctx.review, author=ctx.admin, text='.')
+
+
+def bulk_reviews_data(ctx):
+    from reviews.models import Title
+
+    return [
+        {'title_id': title_id, 'text': 'Отзыв из пакета', 'score': 6}
+        for title_id in Title.objects.values_list('id', flat=True)[:20]
+    ]
+
+
+def signup_data(ctx):
+    name = ctx.unique('bench_signup')
+    return {'username': name, 'email': f'{name}@yamdb.fake'}
+
+
+def token_data(ctx):
+    from django.contrib.auth.tokens import default_token_generator
+
+    user = new_user(ctx)
+    return {'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)}
+
+
+SCENARIOS = (
+    Scenario('auth.signup', 'post', lambda ctx: (
+        ctx.anon_client, '/api/v1/auth/signup/', signup_data(ctx))),
+    Scenario('auth.token', 'post', lambda ctx: (
+        ctx.anon_client, '/api/v1/auth/token/', token_data(ctx))),
+    Scenario('users.list', 'get', lambda ctx: (
+        ctx.admin_client, '/api/v1/users/', None)),
+    Scenario('users.detail', 'get', lambda ctx: (
+        ctx.admin_client, f'/api/v1/users/{ctx.admin.username}/', None)),
+    Scenario('users.create', 'post', lambda ctx: (
+        ctx.admin_client, '/api/v1/users/', signup_data(ctx))),
+    Scenario('users.patch', 'patch', lambda ctx: (
+        ctx.admin_client, f'/api/v1/users/{ctx.admin.username}/',
+        {'bio': ctx.unique('bio')})),
+    Scenario('users.delete', 'delete', lambda ctx: (
+        ctx.admin_client, f'/api/v1/users/{new_user(ctx).username}/', None)),
+    Scenario('users.me', 'get', lambda ctx: (
+        ctx.admin_client, '/api/v1/users/me/', None)),
+    Scenario('users.me.patch', 'patch', lambda ctx: (
+        ctx.admin_client, '/api/v1/users/me/', {'bio': ctx.unique('bio')})),
+    Scenario('categories.list', 'get', lambda ctx: (
+        ctx.anon_client, '/api/v1/categories/', None)),
+    Scenario('categories.create', 'post', lambda ctx: (
+        ctx.admin_client, '/api/v1/categories/',
+        {'name': 'Новая', 'slug': ctx.unique('new-c')})),
+    Scenario('categories.delete', 'delete', lambda ctx: (
+        ctx.admin_client, f'/api/v1/categories/{new_category(ctx).slug}/',
+        None)),
+    Scenario('genres.list', 'get', lambda ctx: (
+        ctx.anon_client, '/api/v1/genres/', None)),
+    Scenario('genres.create', 'post', lambda ctx: (
+        ctx.admin_client, '/api/v1/genres/',
+        {'name': 'Новый', 'slug': ctx.unique('new-g')})),
+    Scenario('genres.delete', 'delete', lambda ctx: (
+        ctx.admin_client, f'/api/v1/genres/{new_genre(ctx).slug}/', None)),
+    Scenario('titles.list', 'get', lambda ctx: (
+        ctx.anon_client, '/api/v1/titles/', None)),
+    Scenario('titles.batch', 'get', lambda ctx: (
+        ctx.anon_client, '/api/v1/titles/',
+        {'ids': ','.join(str(pk) for pk in range(1, 25))})),
+    Scenario('titles.detail', 'get', lambda ctx: (
+        ctx.anon_client, ctx.title_url, None)),
+    Scenario('titles.top', 'get', lambda ctx: (
+        ctx.anon_client, '/api/v1/titles/top/', {'genre': 'genre-0'})),
+    Scenario('titles.score_distribution', 'get', lambda ctx: (
+        ctx.anon_client, f'{ctx.title_url}score-distribution/', None)),
+    Scenario('titles.create', 'post', lambda ctx: (
+        ctx.admin_client, '/api/v1/titles/',
+        {'name': ctx.unique('Новое '), 'year': 2000,
+         'category': 'category-0', 'genre': ['genre-0', 'genre-1']})),
+    Scenario('titles.patch', 'patch', lambda ctx: (
+        ctx.admin_client, ctx.title_url,
+        {'description': ctx.unique('Описание '), 'category': 'category-1'})),
+    Scenario('titles.delete', 'delete', lambda ctx: (
+        ctx.admin_client, f'/api/v1/titles/{new_title(ctx).id}/', None)),
+    Scenario('reviews.list', 'get', lambda ctx: (
+        ctx.anon_client, f'{ctx.title_url}reviews/', None)),
+    Scenario('reviews.detail', 'get', lambda ctx: (
+        ctx.anon_client, ctx.review_url, None)),
+    Scenario('reviews.create', 'post', lambda ctx: (
+        ctx.new_user_client(), f'{ctx.title_url}reviews/',
+        {'text': 'Новый отзыв', 'score': 7})),
+    Scenario('reviews.patch', 'patch', lambda ctx: (
+        ctx.admin_client, ctx.review_url, {'score': ctx.counter % 10 + 1})),
+    Scenario('reviews.delete', 'delete', lambda ctx: (
+        ctx.admin_client,
+        f'{ctx.title_url}reviews/{new_review(ctx).id}/', None)),
+    Scenario('reviews.bulk', 'post', lambda ctx: (
+        ctx.new_user_client(), '/api/v1/reviews/bulk/',
+        bulk_reviews_data(ctx))),
+    Scenario('comments.list', 'get', lambda ctx: (
+        ctx.anon_client, f'{ctx.review_url}comments/', None)),
+    Scenario('comments.detail', 'get', lambda ctx: (
+        ctx.anon_client,
+        f'{ctx.review_url}comments/{new_comment(ctx).id}/', None)),
+    Scenario('comments.create', 'post', lambda ctx: (
+        ctx.admin_client, f'{ctx.review_url}comments/',
+        {'text': 'Новый комментарий'})),
+    Scenario('comments.patch', 'patch', lambda ctx: (
+        ctx.admin_client,
+        f'{ctx.review_url}comments/{new_comment(ctx).id}/',
+        {'text': 'Изменённый'})),
+    Scenario('comments.delete', 'delete', lambda ctx: (
+        ctx.admin_client,
+        f'{ctx.review_url}comments/{new_comment(ctx).id}/', None)),
+    Scenario('export.titles', 'get', lambda ctx: (
+        ctx.admin_client, '/api/v1/export/titles/', None)),
+    Scenario('export.reviews', 'get', lambda ctx: (
+        ctx.admin_client, '/api/v1/export/reviews/', {'since': '2020-01-01'})),
+)
+
+
+def request(client, method, url, data):
+    # Список (пакетная загрузка) отправляется только как JSON.
+    request_format = 'json' if isinstance(data, list) else None
+    response = getattr(client, method)(url, data=data, format=request_format)
+    if response.streaming:
+        # Выгрузка читает БД, пока ответ отдаётся клиенту.
+        b''.join(response.streaming_content)
+    assert response.status_code < 400, (url, response.status_code,
+                                        response.content[:200])
+    return response
+
+
+def run_scenario(ctx, scenario, iterations):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    queries = []
+    client, url, data = scenario.prepare(ctx)
+    request(client, scenario.method, url, data)
+    for _ in range(iterations):
+        client, url, data = scenario.prepare(ctx)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            request(client, scenario.method, url, data)
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(context.captured_queries))
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, MEMORY_ITERATIONS)):
+            client, url, data = scenario.prepare(ctx)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            request(client, scenario.method, url, data)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'queries': statistics.median_low(queries),
+        'queries_max': max(queries),
+        'peak_kib': round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--reviews-per-title', type=int, default=5)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--only', default='',
+                        help='Запускать только сценарии с этим префиксом.')
+    parser.add_argument('--output', help='Файл для JSON-отчёта.')
+    args = parser.parse_args()
+
+    setup_django()
+    import django
+
+    from benchmarks.seed import seed
+
+    with test_database():
+        dataset = seed(args.titles, args.reviews_per_title,
+                       args.comments_per_review)
+        ctx = Context()
+        results = {}
+        for scenario in SCENARIOS:
+            if scenario.name.startswith(args.only):
+                results[scenario.name] = run_scenario(
+                    ctx, scenario, args.iterations)
+    report = {
+        'meta': {
+            'dataset': dataset,
+            'iterations': args.iterations,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as report_file:
+            report_file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
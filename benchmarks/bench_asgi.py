@@ -0,0 +1,155 @@
+"""Пропускная способность чтения API под WSGI и ASGI с медленными клиентами.
+
+WSGI-сервер моделируется пулом из --wsgi-threads потоков: поток занят,
+пока клиент не дочитает ответ (--client-delay). ASGI-приложение
+вызывается в цикле событий, отдача ответа ждёт клиента, не занимая
+потоков.
+
+    python -m benchmarks.bench_asgi --clients 64 --requests 640 \\
+        --client-delay 0.2
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+from benchmarks.utils import percentile, setup_django, test_database
+
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/titles/{title_id}/reviews/',
+)
+
+
+def summarize(latencies, elapsed, statuses):
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(status >= 400 for status in statuses),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def run_wsgi(paths, clients, server_threads, client_delay):
+    from django.db import connections
+    from django.test.client import RequestFactory
+
+    from api_yamdb.wsgi import application
+
+    factory = RequestFactory()
+    server = threading.BoundedSemaphore(server_threads)
+    latencies, statuses = [], []
+
+    def client(client_paths):
+        try:
+            for path in client_paths:
+                statuses_seen = []
+
+                def start_response(status, headers):
+                    statuses_seen.append(int(status.split()[0]))
+
+                started = time.perf_counter()
+                with server:
+                    environ = factory._base_environ(PATH_INFO=path)
+                    body = application(environ, start_response)
+                    for _ in body:
+                        time.sleep(client_delay)
+                    body.close()
+                latencies.append(time.perf_counter() - started)
+                statuses.extend(statuses_seen)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, paths))
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+
+def run_asgi(paths, client_delay):
+    from api_yamdb.asgi import application
+
+    latencies, statuses = [], []
+
+    async def call(path):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif message['type'] == 'http.response.body':
+                await asyncio.sleep(client_delay)
+
+        await application(scope, receive, send)
+
+    async def client(client_paths):
+        for path in client_paths:
+            started = time.perf_counter()
+            await call(path)
+            latencies.append(time.perf_counter() - started)
+
+    async def run_clients():
+        await asyncio.gather(*(client(chunk) for chunk in paths))
+
+    started = time.perf_counter()
+    asyncio.run(run_clients())
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=640)
+    parser.add_argument('--wsgi-threads', type=int, default=8)
+    parser.add_argument('--client-delay', type=float, default=0.2,
+                        help='Сколько секунд клиент читает ответ.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    from benchmarks.seed import seed
+
+    with test_database():
+        seed(args.titles)
+        from reviews.models import Title
+
+        title_ids = cycle(Title.objects.values_list('id', flat=True))
+        templates = cycle(PATHS)
+        urls = [
+            next(templates).format(title_id=next(title_ids))
+            for _ in range(args.requests)
+        ]
+        paths = [urls[index::args.clients] for index in range(args.clients)]
+        report = {
+            'meta': {
+                'clients': args.clients,
+                'client_delay_s': args.client_delay,
+                'wsgi_threads': args.wsgi_threads,
+                'async_read_workers': settings.ASYNC_READ_WORKERS,
+            },
+            'wsgi': run_wsgi(paths, args.clients, args.wsgi_threads,
+                             args.client_delay),
+            'asgi': run_asgi(paths, args.client_delay),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
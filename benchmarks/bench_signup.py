@@ -0,0 +1,78 @@
+"""Пропускная способность /api/v1/auth/signup/ при конкурентной нагрузке.
+
+    python -m benchmarks.bench_signup --requests 500 --threads 8
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import percentile, setup_django, test_database
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+def signup(client, index):
+    data = {'username': f'user{index}', 'email': f'user{index}@yamdb.fake'}
+    started = time.perf_counter()
+    response = client.post(URL_SIGNUP, data=data)
+    assert response.status_code == 200, response.content
+    return time.perf_counter() - started
+
+
+def run_phase(requests, threads, offset=0):
+    from django.db import connections
+    from rest_framework.test import APIClient
+
+    def worker(index):
+        try:
+            return signup(APIClient(), offset + index)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(worker, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'threads': threads,
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def count_queries(index):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    with CaptureQueriesContext(connection) as context:
+        signup(APIClient(), index)
+    return len(context.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        new_user_queries = count_queries(-1)
+        existing_user_queries = count_queries(-1)
+        report = {
+            'queries': {
+                'new_user': new_user_queries,
+                'existing_user': existing_user_queries,
+            },
+            'new_users': run_phase(args.requests, args.threads),
+            'existing_users': run_phase(args.requests, args.threads),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Сравнение двух JSON-отчётов bench_api.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'peak_kib')
+
+
+def load(path):
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)['results']
+
+
+def change(before, after):
+    if before == after:
+        return '='
+    if not before:
+        return 'new'
+    return f'{(after - before) / before * 100:+.0f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+    before, after = load(args.before), load(args.after)
+    header = f'{"scenario":<22}' + ''.join(
+        f'{metric:<28}' for metric in METRICS)
+    print(header)
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            print(f'{name:<22} только в одном из отчётов')
+            continue
+        row = f'{name:<22}'
+        for metric in METRICS:
+            old, new = before[name][metric], after[name][metric]
+            row += f'{old:>9} -> {new:<9} {change(old, new):>5}'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
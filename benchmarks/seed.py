@@ -0,0 +1,61 @@
+"""Наполнение БД для бенчмарков."""
+import random
+
+
+def seed(titles=100, reviews_per_title=5, comments_per_review=2, seed=0):
+    """Создаёт категории, жанры, произведения, отзывы и комментарии.
+
+    Возвращает словарь с количеством созданных объектов.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    # На SQLite bulk_create не возвращает id, поэтому объекты
+    # перечитываются после вставки.
+    rng = random.Random(seed)
+    Category.objects.bulk_create(
+        Category(name=f'Категория {index}', slug=f'category-{index}')
+        for index in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(10)
+    )
+    User.objects.bulk_create(
+        User(username=f'bench{index}', email=f'bench{index}@yamdb.fake')
+        for index in range(max(reviews_per_title, 1))
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    users = list(User.objects.filter(username__startswith='bench'))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {index}', year=1900 + index % 120,
+              category=rng.choice(categories),
+              description='Описание ' * rng.randint(1, 50))
+        for index in range(titles)
+    )
+    created_titles = list(Title.objects.all())
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genre.id)
+        for title in created_titles
+        for genre in rng.sample(genres, 2)
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв ' * rng.randint(1, 80),
+               score=rng.randint(1, 10))
+        for title in created_titles
+        for author in users[:reviews_per_title]
+    )
+    reviews = list(Review.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        Comment(review_id=review_id, author=rng.choice(users),
+                text='Комментарий ' * rng.randint(1, 20))
+        for review_id in reviews
+        for _ in range(comments_per_review)
+    )
+    Title.recalculate_ratings()
+    return {
+        'titles': len(created_titles),
+        'reviews': len(reviews),
+        'comments': len(reviews) * comments_per_review,
+        'users': len(users),
+    }
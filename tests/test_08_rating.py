@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleRanking, User
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user, user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения сбрасывается при каскадном '
+            'удалении последнего отзыва.'
+        )
+        title = Title.objects.get(id=title_id)
+        assert (title.rating_sum, title.rating_count) == (0, 0)
+
+    def test_02_recalculate_rating(self, admin_client, admin, user,
+                                   user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title = Title.objects.get(id=titles[0]['id'])
+        Title.objects.filter(id=title.id).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+        title.recalculate_rating()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            10, 2, 5
+        )
+
+    def count_title_delete_queries(self, admin_client, reviews):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        for index in range(reviews):
+            author = User.objects.create(
+                username=f'author{reviews}_{index}',
+                email=f'author{reviews}_{index}@yamdb.fake')
+            Review.objects.create(
+                title=title, author=author, text='.', score=7)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        return len(context.captured_queries)
+
+    def test_03_title_delete_skips_rating_updates(self, admin_client):
+        few = self.count_title_delete_queries(admin_client, 2)
+        many = self.count_title_delete_queries(admin_client, 20)
+        assert few == many, (
+            'Проверьте, что при удалении произведения рейтинг не '
+            'пересчитывается для каждого удаляемого отзыва.'
+        )
+
+    def test_04_user_delete_updates_titles_once(self, user, admin):
+        titles = []
+        for index in range(20):
+            title = Title.objects.create(name=f'Произведение {index}')
+            Review.objects.create(
+                title=title, author=admin, text='.', score=10)
+            Review.objects.create(
+                title=title, author=user, text='.', score=index % 2 + 1)
+            titles.append(title)
+        with CaptureQueriesContext(connection) as context:
+            user.delete()
+        updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title')
+        ]
+        assert len(updates) == 3, (
+            'Проверьте, что при удалении пользователя рейтинги произведений '
+            'обновляются общими запросами, а не по запросу на отзыв.'
+        )
+        for title in Title.objects.filter(pk__in=[t.pk for t in titles]):
+            assert (title.rating_sum, title.rating_count, title.rating) == (
+                10, 1, 10)
+            assert title.score_distribution[1] == 0
+            assert title.score_distribution[2] == 0
+        assert set(TitleRanking.objects.values_list(
+            'rating', 'rating_count')) == {(10, 1)}
@@ -0,0 +1,46 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def create_titles(self, count):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        titles = []
+        for idx in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    @pytest.mark.parametrize('count', [2, 20])
+    def test_01_title_list_queries(self, client,
+                                   django_assert_num_queries, count):
+        self.create_titles(count)
+        with django_assert_num_queries(4):
+            response = client.get(self.TITLES_URL, {'limit': count})
+        assert len(response.json()['results']) == count, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет '
+            'фиксированное число запросов к БД независимо от размера '
+            'страницы.'
+        )
+
+    def test_02_title_detail_queries(self, client,
+                                     django_assert_num_queries):
+        title = self.create_titles(1)[0]
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert len(response.json()['genre']) == 2
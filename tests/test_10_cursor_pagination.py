@@ -0,0 +1,74 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_reviews(self, django_user_model, count):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        reviews = []
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            reviews.append(Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            ))
+        return title, reviews
+
+    def collect_pages(self, client, url):
+        ids = []
+        response = client.get(url, {'pagination': 'cursor'})
+        while True:
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не выполняет подсчёт '
+                'общего количества объектов.'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                return ids
+            response = client.get(data['next'])
+
+    def test_01_review_cursor_pages(self, client, django_user_model,
+                                    django_assert_num_queries):
+        title, reviews = self.create_reviews(django_user_model, 7)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        assert self.collect_pages(client, url) == [
+            review.id for review in reviews
+        ], (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы в порядке (pub_date, id) без пропусков и повторов.'
+        )
+        with django_assert_num_queries(3):
+            client.get(url, {'pagination': 'cursor'})
+
+    def test_02_comment_cursor_pages(self, client, django_user_model):
+        title, reviews = self.create_reviews(django_user_model, 1)
+        comments = [
+            Comment.objects.create(
+                review=reviews[0], author=reviews[0].author,
+                text=f'comment {idx}'
+            )
+            for idx in range(6)
+        ]
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=reviews[0].id
+        )
+        assert self.collect_pages(client, url) == [
+            comment.id for comment in comments
+        ]
+
+    def test_03_page_number_by_default(self, client, django_user_model):
+        title, _ = self.create_reviews(django_user_model, 2)
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert response.json()['count'] == 2
@@ -0,0 +1,35 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11LoadCsv:
+
+    def test_01_load_static_data(self):
+        call_command('load_csv', batch_size=10, stdout=StringIO())
+        assert User.objects.filter(pk=100).exists(), (
+            'Проверьте, что команда `load_csv` сохраняет первичные ключи '
+            'из CSV.'
+        )
+        review = Review.objects.get(pk=1)
+        assert (review.title_id, review.author_id) == (1, 100)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `load_csv` сохраняет дату публикации '
+            'из CSV.'
+        )
+        assert Comment.objects.exists()
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки отзывов пересчитываются рейтинги '
+            'произведений.'
+        )
+
+    def test_02_load_is_idempotent(self):
+        call_command('load_csv', stdout=StringIO())
+        count = Review.objects.count()
+        call_command('load_csv', stdout=StringIO())
+        assert Review.objects.count() == count
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, DataVersion, Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ListCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRE_URL = '/api/v1/genres/'
+
+    def test_01_list_served_from_cache(self, client,
+                                       django_assert_num_queries):
+        Category.objects.create(name='Фильм', slug='films')
+        client.get(self.CATEGORY_URL)
+        # Из БД читается только версия данных (`DataVersion`).
+        with django_assert_num_queries(1):
+            response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == 1, (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'обслуживается из кеша.'
+        )
+        with django_assert_num_queries(3):
+            client.get(self.CATEGORY_URL, {'search': 'films'})
+
+    def test_02_cache_invalidated_on_write(self, client, admin_client):
+        client.get(self.GENRE_URL)
+        response = admin_client.post(
+            self.GENRE_URL, data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(self.GENRE_URL).json()['count'] == 1, (
+            f'Проверьте, что кеш `{self.GENRE_URL}` сбрасывается при '
+            'создании жанра.'
+        )
+        response = admin_client.delete(f'{self.GENRE_URL}drama/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(self.GENRE_URL).json()['count'] == 0, (
+            f'Проверьте, что кеш `{self.GENRE_URL}` сбрасывается при '
+            'удалении жанра.'
+        )
+        assert not Genre.objects.exists()
+
+    def test_03_write_in_other_process(self, client):
+        client.get(self.GENRE_URL)
+        # Другой воркер: своя запись и смена версии в БД, кеш этого
+        # процесса не трогается.
+        Genre.objects.bulk_create([Genre(name='Драма', slug='drama')])
+        DataVersion.bump('reviews.genre')
+        assert client.get(self.GENRE_URL).json()['count'] == 1, (
+            'Проверьте, что кеш списка не отдаёт устаревшие данные после '
+            'записи в другом процессе.'
+        )
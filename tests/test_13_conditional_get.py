@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.utils.http import http_date
+
+from reviews.models import Comment, DataVersion, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        return etag
+
+    def test_01_titles(self, client, user):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        etag = self.check_not_modified(client, self.TITLES_URL)
+        self.check_not_modified(client, f'{self.TITLES_URL}{title.id}/')
+        Review.objects.create(title=title, author=user, text='.', score=7)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag списка '
+            'произведений меняется.'
+        )
+        assert response.json()['results'][0]['rating'] == 7
+
+    def test_02_reviews_and_comments(self, client, user):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        other = Title.objects.create(name='Чужой', year=1979)
+        review = Review.objects.create(
+            title=title, author=user, text='.', score=7)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id)
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+
+        Review.objects.create(title=other, author=user, text='.', score=1)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв на другое произведение не сбрасывает '
+            'ETag списка отзывов.'
+        )
+
+        Comment.objects.create(review=review, author=user, text='.')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+
+    def test_03_missing_parent(self, client):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=999),
+            HTTP_IF_NONE_MATCH='"stale"'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_version_stored_in_db(self, client):
+        Title.objects.create(name='Терминатор', year=1984)
+        etag = self.check_not_modified(client, self.TITLES_URL)
+        cache.clear()
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что валидаторы строятся из версии данных в БД, а не '
+            'из кеша процесса.'
+        )
+        # Запись в другом процессе меняет только строку в БД.
+        version = DataVersion.objects.get(scope='reviews.title').version + 1
+        DataVersion.objects.filter(scope='reviews.title').update(
+            version=version)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение данных в другом процессе меняет ETag.'
+        )
+        assert response['Last-Modified'] == http_date(version // 10 ** 9), (
+            'Проверьте, что Last-Modified — время последнего изменения.'
+        )
+
+    def test_05_author_renamed(self, client, user, user_client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        Review.objects.create(title=title, author=user, text='.', score=7)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        etag = self.check_not_modified(client, reviews_url)
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что правка профиля без смены имени не сбрасывает '
+            'ETag отзывов.'
+        )
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после смены имени пользователя ETag его '
+            'отзывов меняется.'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
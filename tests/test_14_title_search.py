@@ -0,0 +1,49 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranked(self, client):
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Семейная сага о доне Корлеоне'
+        )
+        Title.objects.create(
+            name='Ёжик в тумане', year=1975, description='Мультфильм'
+        )
+        Title.objects.create(
+            name='Сага о Форсайтах', year=1922, description='Роман'
+        )
+        assert self.search(client, 'КРЕСТН') == ['Крестный отец'], (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет по префиксу слова без учёта регистра.'
+        )
+        assert self.search(client, 'ежик') == ['Ёжик в тумане'], (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'не различает буквы «е» и «ё».'
+        )
+        assert self.search(client, 'сага') == [
+            'Сага о Форсайтах', 'Крестный отец'
+        ], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+        assert self.search(client, '"') == self.search(client, '')
+
+    def test_02_index_follows_writes(self, client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        title.name = 'Чужой'
+        title.save()
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чужой') == ['Чужой']
+        title.delete()
+        assert self.search(client, 'чужой') == []
@@ -0,0 +1,79 @@
+import importlib
+import inspect
+
+import pytest
+
+from api.views import CategoryViewSet
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15FoldedSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def names(self, client, url, params):
+        response = client.get(url, params)
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def test_01_name_folded_maintained(self):
+        title = Title.objects.create(name='ЁЛКИ', year=2010)
+        assert title.name_folded == 'елки'
+        title.name = 'Ёжик в тумане'
+        title.save()
+        title.refresh_from_db()
+        assert title.name_folded == 'ежик в тумане', (
+            'Проверьте, что поле `name_folded` пересчитывается при '
+            'сохранении.'
+        )
+        Genre.objects.bulk_create([Genre(name='Ёмкий жанр', slug='short')])
+        assert Genre.objects.get(slug='short').name_folded == 'емкий жанр'
+
+    def test_02_title_name_filter(self, client):
+        Title.objects.create(name='Ёжик в тумане', year=1975)
+        Title.objects.create(name='Ежевика', year=2000)
+        Title.objects.create(name='Крестный отец', year=1972)
+        assert self.names(client, self.TITLES_URL, {'name': 'ЕЖ'}) == [
+            'Ёжик в тумане', 'Ежевика'
+        ], (
+            f'Проверьте, что фильтр `name` эндпоинта `{self.TITLES_URL}` '
+            'ищет по началу названия без учёта регистра и буквы «ё».'
+        )
+
+    def test_03_category_genre_search(self, client):
+        Category.objects.create(name='Фильм', slug='films')
+        Category.objects.create(name='Книга', slug='books')
+        Genre.objects.create(name='Ёлочные сказки', slug='tales')
+        assert self.names(
+            client, self.CATEGORY_URL, {'search': 'фил'}
+        ) == ['Фильм']
+        assert self.names(
+            client, self.CATEGORY_URL, {'search': 'book'}
+        ) == ['Книга']
+        assert self.names(
+            client, self.GENRES_URL, {'search': 'елочные СКАЗ'}
+        ) == ['Ёлочные сказки']
+
+    def test_04_search_fields_respected(self, client, monkeypatch):
+        Category.objects.create(name='Фильм', slug='films')
+        Category.objects.create(name='Книга', slug='fiction')
+        monkeypatch.setattr(CategoryViewSet, 'search_fields', ['slug'])
+        assert self.names(
+            client, self.CATEGORY_URL, {'search': 'фи'}
+        ) == [], (
+            'Проверьте, что поиск категорий и жанров использует '
+            '`search_fields` представления.'
+        )
+        assert self.names(
+            client, self.CATEGORY_URL, {'search': 'fi'}
+        ) == ['Книга', 'Фильм']
+
+    def test_05_fts_migration_self_contained(self):
+        source = inspect.getsource(
+            importlib.import_module('reviews.migrations.0009_title_fts'))
+        assert 'from reviews' not in source, (
+            'Проверьте, что миграция FTS не импортирует модули приложения: '
+            'их последующие правки не должны менять миграцию.'
+        )
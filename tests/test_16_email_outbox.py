@@ -0,0 +1,97 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+
+from reviews.models import OutgoingEmail
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class RefusingBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP отказал в соединении')
+
+    def send_messages(self, email_messages):
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    VALID_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    @pytest.fixture(autouse=True)
+    def enable_outbox(self, settings):
+        settings.EMAIL_OUTBOX_ENABLED = True
+
+    def test_01_signup_only_queues(self, client):
+        outbox_before_count = len(mail.outbox)
+        response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при включённой очереди письмо не отправляется '
+            'во время запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == self.VALID_DATA['email']
+
+        call_command('send_emails', workers=2, stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_emails` отправляет письма из '
+            'очереди.'
+        )
+        assert self.VALID_DATA['email'] in mail.outbox[-1].to
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.body == '', (
+            'Проверьте, что после отправки текст письма с кодом '
+            'подтверждения удаляется из очереди.'
+        )
+
+        call_command('send_emails', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_failed_send_is_retried_later(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_16_email_outbox.FailingBackend'
+        )
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        call_command('send_emails', stdout=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > email.created, (
+            'Проверьте, что неотправленное письмо откладывается до '
+            'следующей попытки.'
+        )
+
+    def test_03_connection_refused(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_16_email_outbox.RefusingBackend'
+        )
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 1
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        call_command('send_emails', workers=2, stdout=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert (email.sent_at, email.attempts) == (None, 1), (
+            'Проверьте, что ошибка открытия соединения записывается как '
+            'неудачная попытка, а не прерывает команду.'
+        )
+        assert 'отказал' in email.last_error
+        assert email.body == '', (
+            'Проверьте, что после последней попытки текст письма '
+            'удаляется.'
+        )
@@ -0,0 +1,38 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    VALID_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def test_01_new_user(self, client, django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что регистрация через `{self.URL_SIGNUP}` '
+            'выполняет не более двух запросов к БД.'
+        )
+
+    def test_02_existing_user(self, client, django_assert_max_num_queries):
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        with django_assert_max_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_conflicts(self, client, django_assert_max_num_queries):
+        client.post(self.URL_SIGNUP, data=self.VALID_DATA)
+        with django_assert_max_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data={
+                'email': self.VALID_DATA['email'], 'username': 'other'
+            })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'email'}
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'other@yamdb.fake',
+            'username': self.VALID_DATA['username']
+        })
+        assert set(response.json()) == {'username'}
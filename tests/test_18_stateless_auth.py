@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken
+from reviews.models import Title
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18StatelessAuth:
+
+    USERS_URL = '/api/v1/users/'
+    USERS_ME_URL = '/api/v1/users/me/'
+    CATEGORY_URL = '/api/v1/categories/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_token_contains_claims(self, client, user):
+        from django.contrib.auth.tokens import default_token_generator
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = ClaimsAccessToken(response.json()['token'])
+        assert (token['username'], token['role'], token['is_superuser']) == (
+            user.username, user.role, False
+        ), (
+            'Проверьте, что токен содержит утверждения `username`, `role` и '
+            '`is_superuser`.'
+        )
+
+    def test_02_permissions_without_user_query(
+            self, admin, django_assert_num_queries):
+        client = claims_client(admin)
+        # Запись дополнительно читает пользователя, чтобы проверить
+        # `is_active`.
+        with django_assert_num_queries(4):
+            response = client.post(
+                self.CATEGORY_URL, data={'name': 'Фильм', 'slug': 'films'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        with django_assert_num_queries(2):
+            response = client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что права администратора на чтение определяются по '
+            'токену без запроса пользователя из БД.'
+        )
+
+    def test_03_full_user_when_needed(self, user, moderator):
+        client = claims_client(user)
+        response = client.get(self.USERS_ME_URL)
+        assert response.json()['email'] == user.email
+        response = client.patch(self.USERS_ME_URL, data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'новое'
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        response = client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id, review_id=response.json()['id']
+        )
+        response = client.patch(review_url, data={'score': 8})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор с токеном без обращения к БД может '
+            'изменять свой отзыв.'
+        )
+        response = claims_client(moderator).delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_04_user_role_forbidden(self, user):
+        response = claims_client(user).get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_05_inactive_user_cannot_write(self, user, admin):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        user.is_active = False
+        user.save()
+        admin.is_active = False
+        admin.save()
+        response = claims_client(user).post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что деактивированный пользователь не может '
+            'изменять данные по ранее выданному токену.'
+        )
+        assert 'неактивен' in response.json()['detail']
+        response = claims_client(admin).post(
+            self.CATEGORY_URL, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = claims_client(user).patch(
+            self.USERS_ME_URL, data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
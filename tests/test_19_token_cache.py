@@ -0,0 +1,67 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken, TokenCache, token_cache
+
+
+class FakeClock:
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TokenCache:
+
+    USERS_ME_URL = '/api/v1/users/me/'
+
+    def test_01_lru_and_expiry(self, user):
+        token = ClaimsAccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(seconds=60))
+        clock = FakeClock(token['exp'] - 60)
+        cache = TokenCache(maxsize=2, clock=clock)
+
+        cache.set(b'a', token)
+        cache.set(b'b', token)
+        assert cache.get(b'a') is token
+        cache.set(b'c', token)
+        assert cache.get(b'b') is None, (
+            'Проверьте, что при переполнении кеш вытесняет давно не '
+            'использованный токен.'
+        )
+        assert cache.get(b'a') is token
+
+        clock.now = token['exp']
+        assert cache.get(b'a') is None, (
+            'Проверьте, что кеш не выдаёт токен после истечения его срока.'
+        )
+        assert cache.stats() == {
+            'hits': 2, 'misses': 2, 'size': 1, 'maxsize': 2
+        }
+
+    def test_02_repeated_requests_hit_cache(self, user):
+        token_cache.clear()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        for _ in range(3):
+            response = client.get(self.USERS_ME_URL)
+            assert response.status_code == HTTPStatus.OK
+        assert (token_cache.hits, token_cache.misses) == (2, 1), (
+            'Проверьте, что повторно предъявленный токен берётся из кеша.'
+        )
+
+    def test_03_invalid_token_not_cached(self):
+        token_cache.clear()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert token_cache.stats()['size'] == 0
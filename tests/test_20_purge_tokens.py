@@ -0,0 +1,38 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20PurgeTokens:
+
+    def create_token(self, user, jti, expires_in):
+        return OutstandingToken.objects.create(
+            user=user, jti=jti, token=jti,
+            expires_at=timezone.now() + timedelta(seconds=expires_in)
+        )
+
+    def test_01_purge_expired(self, user):
+        for index in range(5):
+            token = self.create_token(user, f'expired{index}', -60)
+            if index % 2:
+                BlacklistedToken.objects.create(token=token)
+        alive = self.create_token(user, 'alive', 3600)
+        BlacklistedToken.objects.create(token=alive)
+
+        out = StringIO()
+        call_command('purge_tokens', batch_size=2, stdout=out)
+        assert list(OutstandingToken.objects.all()) == [alive], (
+            'Проверьте, что команда `purge_tokens` удаляет только '
+            'просроченные токены.'
+        )
+        assert BlacklistedToken.objects.count() == 1
+        report = out.getvalue()
+        assert 'Удалено токенов: 5' in report
+        assert 'из них в чёрном списке: 2' in report
+        assert 'транзакций: 3' in report
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Comment, Review, Title, User
+
+
+def generate(**options):
+    call_command('generate_data', scale=0.01, stdout=StringIO(), **options)
+
+
+def snapshot():
+    return (
+        list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score', 'text', 'pub_date')),
+        list(Comment.objects.order_by('id').values_list(
+            'review_id', 'author_id', 'text', 'pub_date')),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21GenerateData:
+
+    def test_01_reviews_follow_zipf(self):
+        generate(seed=1, batch_size=37)
+        counts = sorted(
+            Title.objects.annotate(total=Count('reviews'))
+            .values_list('total', flat=True),
+            reverse=True
+        )
+        users = User.objects.count()
+        assert counts[0] == users, (
+            'Проверьте, что самое популярное произведение получает отзыв '
+            'от каждого пользователя.'
+        )
+        assert counts[1] == users // 2 and counts[-1] >= 1
+        assert Comment.objects.exists()
+        title = Title.objects.order_by('-rating_count').first()
+        assert title.rating_count == counts[0], (
+            'Проверьте, что после генерации пересчитываются рейтинги.'
+        )
+
+    def test_02_same_seed_same_data(self):
+        generate(seed=5)
+        first = snapshot()
+        Review.objects.all().delete()
+        User.objects.all().delete()
+        Title.objects.all().delete()
+        generate(seed=5)
+        reviews, comments = snapshot()
+        assert (
+            [row[2:] for row in reviews] == [row[2:] for row in first[0]]
+            and [row[2:] for row in comments] == [row[2:] for row in first[1]]
+        ), (
+            'Проверьте, что при одинаковом --seed генерируются одинаковые '
+            'данные.'
+        )
+
+    def test_03_repeated_runs_append(self):
+        generate()
+        count = Review.objects.count()
+        generate()
+        assert Review.objects.count() == 2 * count
+        assert User.objects.count() == 2 * 100
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+from django.db import connection
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_headers(self, client, django_assert_num_queries):
+        Title.objects.create(name='Терминатор', year=1984)
+        with django_assert_num_queries(4, connection=connection):
+            response = client.get(self.TITLES_URL)
+        assert response.get('X-Query-Count') == '4', (
+            'Проверьте, что заголовок `X-Query-Count` содержит число '
+            'запросов к БД.'
+        )
+        assert response.get('Server-Timing', '').startswith('db;dur='), (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` '
+            'со временем в БД.'
+        )
+
+    def test_02_budget_logging(self, client, settings, caplog):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        settings.QUERY_BUDGETS = {
+            'default': (10, 1000),
+            'TitleViewSet.list': (0, 1000),
+        }
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            client.get(self.TITLES_URL)
+            client.get(f'{self.TITLES_URL}{title.id}/')
+        messages = [
+            record.getMessage() for record in caplog.records
+            if record.name == 'api.middleware'
+        ]
+        assert len(messages) == 1 and messages[0].startswith(
+            'TitleViewSet.list '), (
+            'Проверьте, что превышение бюджета запросов логируется '
+            'с именем вида DRF.'
+        )
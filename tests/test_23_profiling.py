@@ -0,0 +1,66 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Profiling:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_admin_summary(self, admin_client):
+        Title.objects.create(name='Терминатор', year=1984)
+        response = admin_client.get(self.TITLES_URL, {'profile': 1})
+        assert response.status_code == HTTPStatus.OK
+        summary = response.json()
+        assert summary['status'] == HTTPStatus.OK and summary['top'], (
+            'Проверьте, что администратор с `?profile=1` получает сводку '
+            'профиля вместо ответа.'
+        )
+        assert set(summary['buckets_ms']) == {
+            'serializer', 'permission', 'db', 'other'}
+        assert summary['buckets_ms']['db'] > 0
+
+        response = admin_client.get(
+            self.TITLES_URL, HTTP_X_PROFILE='headers')
+        assert 'results' in response.json()
+        assert 'prof-serializer;dur=' in response['Server-Timing'], (
+            'Проверьте, что с заголовком `X-Profile: headers` ответ '
+            'сохраняется, а время групп попадает в `Server-Timing`.'
+        )
+
+    def test_02_not_admin(self, client, user_client):
+        for api_client in (client, user_client):
+            response = api_client.get(self.TITLES_URL, {'profile': 1})
+            assert 'results' in response.json(), (
+                'Проверьте, что профиль доступен только администратору.'
+            )
+
+    def test_03_sampling(self, client, settings, caplog):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        with caplog.at_level(logging.INFO, logger='api.middleware'):
+            response = client.get(self.TITLES_URL)
+        assert 'results' in response.json()
+        assert any(
+            record.getMessage().startswith('profile GET /api/v1/titles/')
+            for record in caplog.records
+        ), (
+            'Проверьте, что при `PROFILING_SAMPLE_RATE` запросы '
+            'профилируются в фоне со сводкой в лог.'
+        )
+
+    def test_04_disabled_values(self, admin_client):
+        for params, headers in (({'profile': 0}, {}),
+                                ({'profile': 'false'}, {}),
+                                ({}, {'HTTP_X_PROFILE': '0'})):
+            response = admin_client.get(self.TITLES_URL, params, **headers)
+            assert 'results' in response.json(), (
+                'Проверьте, что профилирование включают только значения '
+                '`1`, `json` и `headers`.'
+            )
+            assert 'prof-' not in response.get('Server-Timing', '')
+        response = admin_client.get(self.TITLES_URL, {'profile': 'json'})
+        assert 'buckets_ms' in response.json()
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24BulkReviews:
+
+    URL = '/api/v1/reviews/bulk/'
+
+    def test_01_per_item_results(self, user_client, user):
+        first = Title.objects.create(name='Терминатор', year=1984)
+        second = Title.objects.create(name='Чужой', year=1979)
+        third = Title.objects.create(name='Бегущий по лезвию', year=1982)
+        Review.objects.create(title=third, author=user, text='.', score=1)
+        data = [
+            {'title_id': first.id, 'text': 'Отлично', 'score': 10},
+            {'title_id': second.id, 'text': 'Хорошо', 'score': 8},
+            {'title_id': second.id, 'text': 'Повтор', 'score': 2},
+            {'title_id': third.id, 'text': 'Уже есть', 'score': 5},
+            {'title_id': 10 ** 6, 'text': 'Нет такого', 'score': 5},
+            {'title_id': first.id, 'text': 'Плохая оценка', 'score': 11},
+            {'title_id': 10 ** 20, 'text': 'Вне диапазона', 'score': 5},
+        ]
+        response = user_client.post(self.URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [
+            201, 201, 400, 400, 404, 400, 400], (
+            'Проверьте, что `/api/v1/reviews/bulk/` возвращает результат '
+            'для каждого элемента в порядке запроса.'
+        )
+        review = Review.objects.get(pk=results[0]['id'])
+        assert (review.title_id, review.author, review.score) == (
+            first.id, user, 10)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.rating, second.rating) == (10, 8), (
+            'Проверьте, что после пакетной загрузки обновляются рейтинги.'
+        )
+
+    def test_02_query_count(self, user_client):
+        titles = [
+            Title.objects.create(name=f'Произведение {index}', year=2000)
+            for index in range(20)
+        ]
+        data = [
+            {'title_id': title.id, 'text': '.', 'score': 5}
+            for title in titles
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(self.URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert Review.objects.count() == len(titles)
+        # Выборка произведений, проверка уникальности, вставка, id,
+        # смена версии данных и по одному обновлению рейтинга на
+        # произведение.
+        assert len(context.captured_queries) <= 5 + len(titles) + 3, (
+            'Проверьте, что отзывы создаются без запросов на каждый '
+            'элемент помимо обновления рейтинга.'
+        )
+
+    def test_03_invalid_payload(self, client, user_client):
+        response = client.post(
+            self.URL, data=[], content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(
+            self.URL, data={'title_id': 1}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
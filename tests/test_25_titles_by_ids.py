@@ -0,0 +1,47 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitlesByIds:
+
+    URL = '/api/v1/titles/'
+
+    def test_01_order_and_missing(self, client, django_assert_num_queries):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        titles = [
+            Title.objects.create(name=name, year=2000)
+            for name in ('Альфа', 'Бета', 'Гамма')
+        ]
+        for title in titles:
+            title.genre.add(genre)
+        ids = [titles[2].id, 10 ** 6, titles[0].id, titles[2].id]
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.URL, {'ids': ','.join(map(str, ids))})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            titles[2].id, titles[0].id], (
+            'Проверьте, что `?ids=` возвращает произведения в порядке '
+            'запроса.'
+        )
+        assert data['missing'] == [10 ** 6], (
+            'Проверьте, что `?ids=` сообщает о ненайденных id.'
+        )
+        assert data['results'][0]['genre'][0]['slug'] == 'drama'
+
+    def test_02_invalid_ids(self, client, settings):
+        response = client.get(self.URL, {'ids': '1,abc'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.URL, {'ids': f'1,{10 ** 20}'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что id вне диапазона BigAutoField отклоняются с '
+            'ошибкой 400.'
+        )
+        settings.TITLES_MAX_IDS = 2
+        response = client.get(self.URL, {'ids': '1,2,3'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=category,
+            description='Очень длинное описание')
+        title.genre.add(genre)
+        return title
+
+    def test_01_fields(self, client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.TITLES_URL, {'fields': 'id,name,rating'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'id': title.id, 'name': 'Терминатор', 'rating': None}], (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что `?fields=` исключает из SQL-запроса колонки и '
+            'связи убранных полей.'
+        )
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что без поля `genre` жанры не подгружаются.'
+        )
+
+    def test_02_omit(self, client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'{self.TITLES_URL}{title.id}/', {'omit': 'description'})
+        data = response.json()
+        assert 'description' not in data
+        assert data['category']['slug'] == 'movie'
+        assert data['genre'][0]['slug'] == 'drama'
+        assert all('description' not in query['sql']
+                   for query in context.captured_queries)
+
+    def test_03_reviews_and_comments(self, client, user, title):
+        review = Review.objects.create(
+            title=title, author=user, text='Длинный текст', score=7)
+        url = f'{self.TITLES_URL}{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'omit': 'text,author'})
+        assert response.json()['results'] == [{
+            'id': review.id, 'title': title.id, 'score': 7,
+            'pub_date': response.json()['results'][0]['pub_date']}]
+        sql = context.captured_queries[-1]['sql']
+        assert '"text"' not in sql and 'reviews_user' not in sql
+        response = client.get(
+            f'{url}{review.id}/comments/', {'fields': 'id,text'})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_unknown_field(self, client, title):
+        response = client.get(self.TITLES_URL, {'fields': 'name,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `?fields=` приводит к '
+            'ошибке 400.'
+        )
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Comment, Genre, Review, Title
+
+
+def read_ndjson(response):
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@async_to_sync
+async def call_asgi(path, headers):
+    """Запрос напрямую к `api_yamdb.asgi.application`, как от сервера."""
+    from api_yamdb.asgi import application
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'},
+        'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Export:
+
+    URL = '/api/v1/export/'
+
+    def test_01_titles(self, admin_client, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        titles = [
+            Title.objects.create(name=f'Произведение {index}', year=2000)
+            for index in range(5)
+        ]
+        titles[0].genre.add(drama, comedy)
+        titles[3].genre.add(drama)
+        rows = read_ndjson(admin_client.get(f'{self.URL}titles/'))
+        assert [row['id'] for row in rows] == [title.id for title in titles]
+        assert [row['genre'] for row in rows] == [
+            ['comedy', 'drama'], [], [], ['drama'], []], (
+            'Проверьте, что выгрузка произведений содержит слаги жанров.'
+        )
+        rows = read_ndjson(admin_client.get(
+            f'{self.URL}titles/', {'after_id': titles[2].id}))
+        assert [row['id'] for row in rows] == [titles[3].id, titles[4].id]
+
+    def test_02_reviews_since(self, admin_client, user, admin):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        old = Review.objects.create(
+            title=title, author=user, text='Старый', score=3)
+        Review.objects.filter(pk=old.pk).update(
+            pub_date=datetime(2000, 1, 1, tzinfo=timezone.utc))
+        new = Review.objects.create(
+            title=title, author=admin, text='Новый', score=9)
+        Comment.objects.create(review=new, author=user, text='Ответ')
+        rows = read_ndjson(admin_client.get(
+            f'{self.URL}reviews/', {'since': '2010-01-01T00:00:00'}))
+        assert [(row['id'], row['author'], row['score']) for row in rows] == [
+            (new.id, admin.username, 9)], (
+            'Проверьте, что `since` отбирает отзывы по дате публикации.'
+        )
+        rows = read_ndjson(admin_client.get(
+            f'{self.URL}reviews/', {'since': '2010-01-01'}))
+        assert [row['id'] for row in rows] == [new.id], (
+            'Проверьте, что `since` принимает дату без времени.'
+        )
+        rows = read_ndjson(admin_client.get(f'{self.URL}comments/'))
+        assert [(row['review'], row['text']) for row in rows] == [
+            (new.id, 'Ответ')]
+
+    def test_03_access_and_errors(self, admin_client, user_client, client):
+        for api_client in (client, user_client):
+            response = api_client.get(f'{self.URL}titles/')
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN), (
+                'Проверьте, что выгрузка доступна только администратору.'
+            )
+        response = admin_client.get(
+            f'{self.URL}titles/', {'since': '2020-01-01T00:00:00'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(
+            f'{self.URL}reviews/', {'since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(
+            f'{self.URL}reviews/', {'since': '2020-02-30'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(
+            f'{self.URL}titles/', {'after_id': 10 ** 20})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что слишком большой `after_id` отклоняется до '
+            'начала выгрузки.'
+        )
+
+    def test_04_asgi(self, admin):
+        Title.objects.create(name='Терминатор', year=1984)
+        token = AccessToken.for_user(admin)
+        path = f'{self.URL}titles/'
+        messages = call_asgi(path, [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ])
+        assert messages[0]['type'] == 'http.response.start'
+        assert messages[0]['status'] == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что под ASGI выгрузка не подключена: Django 3.2 '
+            'читает потоковый ответ в цикле событий, где нельзя '
+            'обращаться к БД.'
+        )
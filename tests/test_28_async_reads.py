@@ -0,0 +1,84 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import async_views
+from reviews.models import Review, Title
+
+
+@async_to_sync
+async def request(method, url, token=None, **extra):
+    if token is not None:
+        # AsyncClient в Django 3.2 передаёт extra как заголовки ASGI.
+        extra['authorization'] = f'Bearer {token}'
+    return await getattr(AsyncClient(), method)(url, **extra)
+
+
+def get(url, token=None):
+    return request('get', url, token)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28AsyncReads:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def view_threads(self, monkeypatch):
+        threads = []
+        run_view = async_views.run_view
+
+        def recording_run_view(*args):
+            threads.append(threading.current_thread().name)
+            return run_view(*args)
+
+        monkeypatch.setattr(async_views, 'run_view', recording_run_view)
+        return threads
+
+    def test_01_reads_in_pool(self, user, view_threads):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        review = Review.objects.create(
+            title=title, author=user, text='.', score=7)
+        urls = (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}{title.id}/',
+            f'{self.TITLES_URL}{title.id}/reviews/',
+            f'{self.TITLES_URL}{title.id}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            response = get(url)
+            assert response.status_code == HTTPStatus.OK, url
+        assert get(self.TITLES_URL).json()['results'][0]['rating'] == 7
+        assert len(view_threads) == len(urls) + 1 and all(
+            name.startswith('api-read') for name in view_threads), (
+            'Проверьте, что под ASGI чтение произведений, отзывов и '
+            'комментариев выполняется в пуле потоков.'
+        )
+        assert get(self.TITLES_URL)['X-Query-Count'] == '4', (
+            'Проверьте, что под ASGI считаются запросы к БД из пула.'
+        )
+
+    def test_02_writes_and_other_views(self, admin, view_threads):
+        token = AccessToken.for_user(admin)
+        response = request(
+            'post', '/api/v1/categories/', token,
+            data={'name': 'Фильм', 'slug': 'movie'},
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED
+        response = get('/api/v1/users/me/', token=token)
+        assert response.json()['username'] == admin.username
+        assert view_threads and not any(
+            name.startswith('api-read') for name in view_threads)
+
+    def test_03_profiling(self, admin):
+        Title.objects.create(name='Терминатор', year=1984)
+        token = AccessToken.for_user(admin)
+        response = get(f'{self.TITLES_URL}?profile=1', token=token)
+        summary = response.json()
+        assert summary['buckets_ms']['db'] > 0, (
+            'Проверьте, что под ASGI профилируется поток, выполняющий вид.'
+        )
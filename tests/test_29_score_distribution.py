@@ -0,0 +1,98 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, User
+from tests.utils import separate_process_cache
+
+
+def expected(**counts):
+    distribution = {str(score): 0 for score in range(1, 11)}
+    distribution.update(counts)
+    return distribution
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ScoreDistribution:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_incremental(self, client, user, admin):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        review = Review.objects.create(
+            title=title, author=user, text='.', score=7)
+        Review.objects.create(title=title, author=admin, text='.', score=7)
+        url = f'{self.TITLES_URL}{title.id}/'
+        assert client.get(url).json()['score_distribution'] == expected(
+            **{'7': 2}), (
+            'Проверьте, что ответ с произведением содержит распределение '
+            'оценок.'
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.score = 3
+        review.save()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}score-distribution/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'title': title.id, 'count': 2, 'rating': 5.0,
+            'distribution': expected(**{'3': 1, '7': 1})}, (
+            'Проверьте, что `/score-distribution/` возвращает распределение '
+            'оценок и пересчитывает его при изменении отзыва.'
+        )
+        assert len(context.captured_queries) == 2
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'fields': 'id,score_distribution'})
+        assert response.json()['score_distribution']['3'] == 1
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что `?fields=score_distribution` выбирает счётчики '
+            'оценок тем же запросом.'
+        )
+        review.delete()
+        User.objects.filter(pk=admin.pk).delete()
+        title.refresh_from_db()
+        assert title.score_distribution == {
+            score: 0 for score in range(1, 11)}
+
+    def test_02_bulk_and_list(self, user_client, client):
+        titles = [
+            Title.objects.create(name=f'Произведение {index}', year=2000)
+            for index in range(2)
+        ]
+        user_client.post('/api/v1/reviews/bulk/', data=[
+            {'title_id': title.id, 'text': '.', 'score': 10}
+            for title in titles
+        ], format='json')
+        response = client.get(f'{self.TITLES_URL}{titles[0].id}/')
+        assert response.json()['score_distribution']['10'] == 1
+        results = client.get(self.TITLES_URL).json()['results']
+        assert all('score_10' not in item and 'score_distribution' not in item
+                   for item in results)
+
+    def test_03_rebuild_command(self, client, user):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        Review.objects.create(title=title, author=user, text='.', score=4)
+        Title.objects.filter(pk=title.pk).update(score_4=0, score_9=5)
+        url = f'{self.TITLES_URL}{title.id}/'
+        etag = client.get(url)['ETag']
+        out = StringIO()
+        # Команда работает в отдельном процессе со своим кешем.
+        with separate_process_cache():
+            call_command('rebuild_score_distribution', batch_size=1,
+                         stdout=out)
+        title.refresh_from_db()
+        assert (title.score_4, title.score_9) == (1, 0), (
+            'Проверьте, что команда `rebuild_score_distribution` '
+            'исправляет распределение оценок.'
+        )
+        assert 'исправлено: 1' in out.getvalue()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после исправления данных командой ETag '
+            'произведения меняется.'
+        )
+        assert response.json()['score_distribution']['4'] == 1
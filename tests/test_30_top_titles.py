@@ -0,0 +1,128 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from tests.utils import separate_process_cache
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def create_titles(self, user, admin, moderator):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        scores = {
+            ('Титаник', films, drama): (9, 7),
+            ('Маска', films, comedy): (10,),
+            ('Война и мир', books, drama): (8, 8, 8),
+            ('Без отзывов', books, comedy): (),
+        }
+        titles = {}
+        for (name, category, genre), title_scores in scores.items():
+            title = Title.objects.create(
+                name=name, year=2000, category=category)
+            title.genre.set([genre])
+            for author, score in zip((user, admin, moderator), title_scores):
+                Review.objects.create(
+                    title=title, author=author, text='.', score=score)
+            titles[name] = title
+        return titles
+
+    def get_names(self, client, query=''):
+        response = client.get(f'{self.TOP_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` возвращает '
+            'статус 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_filters(self, client, user, admin, moderator):
+        self.create_titles(user, admin, moderator)
+        assert self.get_names(client) == ['Маска', 'Война и мир', 'Титаник'], (
+            'Проверьте, что топ упорядочен по убыванию рейтинга, затем '
+            'числа оценок, и не содержит произведений без отзывов.'
+        )
+        assert self.get_names(client, 'genre=drama') == [
+            'Война и мир', 'Титаник']
+        assert self.get_names(client, 'category=books') == ['Война и мир']
+        assert self.get_names(client, 'genre=comedy&category=films') == [
+            'Маска']
+        assert self.get_names(client, 'min_reviews=2') == [
+            'Война и мир', 'Титаник'], (
+            'Проверьте, что `?min_reviews=` отбрасывает произведения с '
+            'меньшим числом оценок.'
+        )
+        response = client.get(f'{self.TOP_URL}?min_reviews=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(f'{self.TOP_URL}?min_reviews={10 ** 20}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_incremental(self, client, user, admin, moderator):
+        titles = self.create_titles(user, admin, moderator)
+        Review.objects.filter(title=titles['Маска']).delete()
+        review = Review.objects.get(title=titles['Титаник'], author=admin)
+        review.score = 3
+        review.save()
+        assert self.get_names(client) == ['Война и мир', 'Титаник'], (
+            'Проверьте, что рейтинг топа обновляется при изменении и '
+            'удалении отзывов.'
+        )
+        titles['Титаник'].genre.set(Genre.objects.filter(slug='comedy'))
+        assert self.get_names(client, 'genre=drama') == ['Война и мир'], (
+            'Проверьте, что топ по жанру учитывает изменение жанров.'
+        )
+        Category.objects.filter(slug='books').delete()
+        assert self.get_names(client, 'category=books') == []
+        assert TitleRanking.objects.filter(genre__isnull=True).count() == 4
+
+    def test_03_constant_queries(self, client, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for index in range(12):
+            title = Title.objects.create(
+                name=f'Произведение {index}', year=2000, category=category)
+            title.genre.set([genre])
+            Review.objects.create(
+                title=title, author=user, text='.', score=index % 10 + 1)
+        url = f'{self.TOP_URL}?genre=drama&page_size=5'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                data = client.get(url).json()
+            assert len(context.captured_queries) == 3, (
+                'Проверьте, что страница топа читается фиксированным числом '
+                'запросов к БД.'
+            )
+            seen.extend(title['id'] for title in data['results'])
+            url = data['next']
+        assert len(seen) == len(set(seen)) == 12, (
+            'Проверьте, что курсорные страницы топа не теряют и не '
+            'повторяют произведения.'
+        )
+
+    def test_04_refresh_command(self, client, user, admin, moderator):
+        self.create_titles(user, admin, moderator)
+        TitleRanking.objects.all().delete()
+        assert self.get_names(client) == []
+        etag = client.get(self.TOP_URL)['ETag']
+        out = StringIO()
+        with separate_process_cache():
+            call_command('refresh_title_ranking', stdout=out)
+        assert 'Строк в рейтинге: 8.' in out.getvalue()
+        response = client.get(self.TOP_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `refresh_title_ranking` сбрасывает ETag '
+            'ответов работающих процессов.'
+        )
+        assert self.get_names(client) == ['Маска', 'Война и мир', 'Титаник'], (
+            'Проверьте, что `refresh_title_ranking` перестраивает рейтинг.'
+        )
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TitleFacets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        data = (
+            ('Титаник', 1997, films, [drama]),
+            ('Маска', 1994, films, [comedy]),
+            ('Война и мир', 1869, books, [drama]),
+            ('Двенадцать стульев', 1928, books, [comedy, drama]),
+            ('Без категории', 1994, None, []),
+        )
+        for name, year, category, genres in data:
+            title = Title.objects.create(
+                name=name, year=year, category=category)
+            title.genre.set(genres)
+
+    def get_facets(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['facets']
+
+    def test_01_counts(self, client, titles):
+        response = client.get(self.TITLES_URL)
+        assert 'facets' not in response.json(), (
+            'Проверьте, что фасеты возвращаются только по `?facets=`.'
+        )
+        assert self.get_facets(client, 'facets=') == {
+            'genre': {'comedy': 2, 'drama': 3},
+            'category': {'books': 2, 'films': 2},
+            'year': {'1869': 1, '1928': 1, '1994': 2, '1997': 1},
+        }, (
+            'Проверьте, что `?facets=` возвращает число произведений для '
+            'каждого жанра, категории и года.'
+        )
+        assert self.get_facets(
+            client, 'facets=genre,category&category=books'
+        ) == {
+            'genre': {'comedy': 1, 'drama': 2},
+            'category': {'books': 2, 'films': 2},
+        }, (
+            'Проверьте, что фасеты учитывают остальные фильтры, но не '
+            'собственный.'
+        )
+        assert self.get_facets(client, 'facets=year&search=мир') == {
+            'year': {'1869': 1}}
+        response = client.get(f'{self.TITLES_URL}?facets=rating')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_queries_and_cache(self, client, titles):
+        query = 'facets=&genre=drama&limit=1'
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'{self.TITLES_URL}?{query}')
+        page_queries = 4
+        assert len(context.captured_queries) == page_queries + 3, (
+            'Проверьте, что каждый фасет считается одним агрегирующим '
+            'запросом.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            facets = self.get_facets(client, f'{query}&offset=1')
+        assert len(context.captured_queries) == page_queries, (
+            'Проверьте, что фасеты кешируются по набору фильтров, без '
+            'учёта пагинации.'
+        )
+        assert facets['category'] == {'books': 2, 'films': 1}
+        assert '1972' not in self.get_facets(client, 'facets=year')['year']
+        Title.objects.create(name='Солярис', year=1972)
+        assert self.get_facets(client, 'facets=year')['year']['1972'] == 1, (
+            'Проверьте, что кеш фасетов сбрасывается при изменении '
+            'произведений.'
+        )
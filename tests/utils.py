@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.conf import settings
+from django.test import override_settings
+
 check_name_and_slug_patterns = (
     (
         {
@@ -304,3 +307,17 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def separate_process_cache():
+    """Кеш ответов, как у отдельного процесса (например, команды)."""
+    return override_settings(
+        CACHES={
+            **settings.CACHES,
+            'separate': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'separate',
+            },
+        },
+        LIST_CACHE_ALIAS='separate',
+    )